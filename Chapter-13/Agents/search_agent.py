@@ -1,9 +1,13 @@
 # Agents/search_agent.py
 from agents import Agent
-from Tools.arxiv_tool import search_arxiv
+from Tools.arxiv_tool import search_arxiv, ArxivSearchResult
 
 search_agent = Agent(
     name="SearchAgent",
-    instructions="You are a helpful research assistant. Your sole purpose is to call the `search_arxiv` tool with the user's query.",
+    instructions="You are a helpful research assistant. Your sole purpose is to call the `search_arxiv` tool with the user's query and return its structured result.",
     tools=[search_arxiv],
+    # The tool's ArxivSearchResult becomes the final output as is, so the model
+    # never has to copy every paper summary back out as output tokens.
+    tool_use_behavior="stop_on_first_tool",
+    output_type=ArxivSearchResult,
 )
\ No newline at end of file
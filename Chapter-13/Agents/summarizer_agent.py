@@ -0,0 +1,17 @@
+# Agents/summarizer_agent.py
+from agents import Agent
+
+summarizer_agent = Agent(
+    name="SummarizerAgent",
+    instructions=(
+        "You are a research analyst condensing material for a technical writer. You will receive either "
+        "a batch of research papers or several partial summaries of papers on the same topic."
+        "\n\n"
+        "**CRITICAL INSTRUCTIONS:**"
+        "\n1. Produce one concise markdown summary that groups related work and highlights key findings."
+        "\n2. Keep every paper's title and publication date next to the points drawn from it."
+        "\n3. Do not invent papers, results or dates that are not in the input."
+        "\n4. Return only the summary."
+    ),
+    model="gpt-4o-mini",
+)
@@ -0,0 +1,155 @@
+# Tools/arxiv_cache.py
+"""
+A persistent local cache of ArXiv search results.
+
+Every paper fetched from the ArXiv API is stored once in SQLite, together
+with the list of paper ids each query returned. A repeated query (or the same
+query asking for fewer results) is answered from disk while it is fresh.
+A full-text index over titles and summaries also allows searching everything
+seen so far without any network access, which is handy for local tests.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), '..', '.cache', 'arxiv.db')
+
+
+def _normalize_query(query: str) -> str:
+    """Makes 'Large  Language models' and 'large language models' share one cache entry."""
+    return " ".join(query.lower().split())
+
+
+class ArxivCache:
+    """Stores paper records (as dicts with the `ArxivPaper` fields) and query results."""
+    def __init__(self, path: str = CACHE_PATH, freshness_seconds: float = 24 * 3600):
+        self.path = path
+        self.freshness_seconds = freshness_seconds
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS papers (
+                    paper_id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    published_date TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS queries (
+                    query TEXT PRIMARY KEY,
+                    max_results INTEGER NOT NULL,
+                    paper_ids TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(paper_id UNINDEXED, title, summary, tokenize='porter unicode61')"
+                )
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # Some SQLite builds ship without FTS5; offline search then falls back to LIKE.
+                self.has_fts = False
+
+    def get_query(self, query: str, max_results: int) -> Optional[List[Dict]]:
+        """
+        Returns the cached papers for `query` if the entry is still fresh and
+        was fetched with at least `max_results` results; otherwise None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT max_results, paper_ids, fetched_at FROM queries WHERE query = ?",
+                (_normalize_query(query),),
+            ).fetchone()
+        if not row or time.time() - row["fetched_at"] > self.freshness_seconds:
+            return None
+        paper_ids = json.loads(row["paper_ids"])
+        # A query that returned fewer papers than it asked for has no more to give.
+        if row["max_results"] < max_results and len(paper_ids) >= row["max_results"]:
+            return None
+        return self._load_papers(paper_ids[:max_results])
+
+    def _load_papers(self, paper_ids: List[str]) -> List[Dict]:
+        if not paper_ids:
+            return []
+        placeholders = ",".join("?" * len(paper_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT paper_id, title, summary, published_date FROM papers WHERE paper_id IN ({placeholders})",
+                paper_ids,
+            ).fetchall()
+        by_id = {row["paper_id"]: dict(row) for row in rows}
+        return [by_id[paper_id] for paper_id in paper_ids if paper_id in by_id]
+
+    def store_papers(self, papers: List[Dict]) -> None:
+        """Adds or refreshes paper records and their full-text index entries."""
+        now = time.time()
+        with self._lock, self._conn:
+            for paper in papers:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO papers (paper_id, title, summary, published_date, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (paper["paper_id"], paper["title"], paper["summary"], paper["published_date"], now),
+                )
+                if self.has_fts:
+                    self._conn.execute("DELETE FROM papers_fts WHERE paper_id = ?", (paper["paper_id"],))
+                    self._conn.execute(
+                        "INSERT INTO papers_fts (paper_id, title, summary) VALUES (?, ?, ?)",
+                        (paper["paper_id"], paper["title"], paper["summary"]),
+                    )
+
+    def store_query(self, query: str, max_results: int, papers: List[Dict]) -> None:
+        """Caches the papers returned for `query`, in their original order."""
+        self.store_papers(papers)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (query, max_results, paper_ids, fetched_at) VALUES (?, ?, ?, ?)",
+                (_normalize_query(query), max_results, json.dumps([p["paper_id"] for p in papers]), time.time()),
+            )
+
+    def search_offline(self, query: str, limit: int = 5) -> List[Dict]:
+        """
+        Searches every cached paper by title and summary, newest first.
+        All words of the query must match.
+        """
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            return []
+        with self._lock:
+            if self.has_fts:
+                match = " AND ".join(f'"{word}"' for word in words)
+                rows = self._conn.execute(
+                    """
+                    SELECT p.paper_id, p.title, p.summary, p.published_date
+                    FROM papers_fts f JOIN papers p ON p.paper_id = f.paper_id
+                    WHERE papers_fts MATCH ?
+                    ORDER BY p.published_date DESC LIMIT ?
+                    """,
+                    (match, limit),
+                ).fetchall()
+            else:
+                conditions = " AND ".join("(LOWER(title) LIKE ? OR LOWER(summary) LIKE ?)" for _ in words)
+                params = [value for word in words for value in (f"%{word}%", f"%{word}%")]
+                rows = self._conn.execute(
+                    f"SELECT paper_id, title, summary, published_date FROM papers WHERE {conditions} "
+                    "ORDER BY published_date DESC LIMIT ?",
+                    params + [limit],
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self._conn.close()
@@ -1,10 +1,13 @@
 # tools/arxiv_tool.py
+import os
+import asyncio
 import requests
 import xml.etree.ElementTree as ET
 from agents import function_tool
 from pydantic import BaseModel, Field
-from typing import List
+from typing import AsyncIterator, List
 from datetime import datetime
+from Tools.arxiv_cache import ArxivCache
 
 # --- Pydantic Models for Structured API Data ---
 class ArxivPaper(BaseModel):
@@ -18,6 +21,66 @@ class ArxivSearchResult(BaseModel):
     """A data structure to hold a list of papers from an ArXiv search."""
     papers: List[ArxivPaper]
 
+# --- Local Cache ---
+# Results are cached on disk and reused for `ARXIV_CACHE_FRESHNESS` seconds.
+# Set ARXIV_OFFLINE=1 to answer every search from the local full-text index.
+_cache: ArxivCache | None = None
+
+def get_arxiv_cache() -> ArxivCache:
+    """Returns the shared cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ArxivCache(freshness_seconds=float(os.getenv("ARXIV_CACHE_FRESHNESS", 24 * 3600)))
+    return _cache
+
+def _search_offline(query: str, max_results: int) -> ArxivSearchResult:
+    papers = get_arxiv_cache().search_offline(query, limit=max_results)
+    return ArxivSearchResult(papers=[ArxivPaper(**paper) for paper in papers])
+
+# --- Fetching & Parsing ---
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+
+def _parse_entry(entry: ET.Element) -> ArxivPaper:
+    """Converts one Atom `<entry>` element into an `ArxivPaper`."""
+    # Extract all the necessary fields from the XML response
+    paper_id = entry.find(f'{ATOM_NS}id').text
+    title = entry.find(f'{ATOM_NS}title').text.strip()
+    summary = entry.find(f'{ATOM_NS}summary').text.strip()
+    published = entry.find(f'{ATOM_NS}published').text
+
+    # Create an instance of our Pydantic model
+    return ArxivPaper(
+        paper_id=paper_id,
+        title=title,
+        summary=summary,
+        # Format the date for better readability
+        published_date=datetime.fromisoformat(published.replace('Z', '+00:00')).strftime('%Y-%m-%d')
+    )
+
+def _fetch_page(query: str, start: int, page_size: int) -> List[ArxivPaper]:
+    """
+    Downloads one page of results and parses it incrementally with
+    `iterparse`: each `<entry>` is converted and then cleared, so the full
+    XML document is never held in memory.
+    """
+    params = {
+        "search_query": f"all:{query}",
+        "start": start,
+        "max_results": page_size,
+        "sortBy": "submittedDate",
+        "sortOrder": "descending"
+    }
+    papers = []
+    with requests.get(ARXIV_API_URL, params=params, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True # Transparently un-gzip the stream
+        for _, element in ET.iterparse(response.raw, events=("end",)):
+            if element.tag == f'{ATOM_NS}entry':
+                papers.append(_parse_entry(element))
+                element.clear()
+    return papers
+
 # --- Updated Tool Function ---
 @function_tool
 def search_arxiv(query: str, max_results: int = 5) -> ArxivSearchResult:
@@ -26,38 +89,60 @@ def search_arxiv(query: str, max_results: int = 5) -> ArxivSearchResult:
     list of paper objects, including their publication dates.
     """
     print(f"🛠️  [Tool Call] Searching ArXiv for: '{query}'")
-    base_url = "http://export.arxiv.org/api/query"
-    params = {
-        "search_query": f"all:{query}",
-        "start": 0,
-        "max_results": max_results,
-        "sortBy": "submittedDate",
-        "sortOrder": "descending"
-    }
+    if os.getenv("ARXIV_OFFLINE") == "1":
+        return _search_offline(query, max_results)
+
+    cache = get_arxiv_cache()
+    cached_papers = cache.get_query(query, max_results)
+    if cached_papers is not None:
+        print(f"🛠️  [Cache] Answered '{query}' from the local ArXiv cache.")
+        return ArxivSearchResult(papers=[ArxivPaper(**paper) for paper in cached_papers])
+
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        
-        root = ET.fromstring(response.content)
-        papers = []
-        for entry in root.findall('{http://www.w3.org/2005/Atom}entry'):
-            # Extract all the necessary fields from the XML response
-            paper_id = entry.find('{http://www.w3.org/2005/Atom}id').text
-            title = entry.find('{http://www.w3.org/2005/Atom}title').text.strip()
-            summary = entry.find('{http://www.w3.org/2005/Atom}summary').text.strip()
-            published = entry.find('{http://www.w3.org/2005/Atom}published').text
-            
-            # Create an instance of our Pydantic model
-            papers.append(ArxivPaper(
-                paper_id=paper_id,
-                title=title,
-                summary=summary,
-                # Format the date for better readability
-                published_date=datetime.fromisoformat(published.replace('Z', '+00:00')).strftime('%Y-%m-%d')
-            ))
-        
+        papers = _fetch_page(query, start=0, page_size=max_results)
+        cache.store_query(query, max_results, [paper.model_dump() for paper in papers])
+
         # Return the structured result
         return ArxivSearchResult(papers=papers)
     except requests.RequestException as e:
-        print(f"Error connecting to ArXiv: {e}")
-        return ArxivSearchResult(papers=[])
\ No newline at end of file
+        print(f"Error connecting to ArXiv: {e}. Falling back to the local cache.")
+        return _search_offline(query, max_results)
+
+
+# --- Bulk Harvesting ---
+async def harvest_arxiv(
+    query: str,
+    total: int = 1000,
+    page_size: int = 100,
+    delay_seconds: float = 3.0,
+) -> AsyncIterator[ArxivPaper]:
+    """
+    Pages through every result for `query` (up to `total`) and yields each
+    paper as soon as its page has been parsed, so downstream stages can start
+    before the whole corpus has arrived. Pages are requested `delay_seconds`
+    apart, as the ArXiv API terms ask, and every paper is added to the local
+    cache so it becomes searchable offline.
+    """
+    print(f"🛠️  [Harvest] Collecting up to {total} ArXiv papers for: '{query}'")
+    cache = get_arxiv_cache()
+    harvested = 0
+    start = 0
+    while harvested < total:
+        if start:
+            await asyncio.sleep(delay_seconds)
+        size = min(page_size, total - harvested)
+        try:
+            # The blocking download and parse run in a worker thread so the event loop stays free.
+            papers = await asyncio.to_thread(_fetch_page, query, start, size)
+        except requests.RequestException as e:
+            print(f"Error connecting to ArXiv during harvest: {e}")
+            return
+        if not papers:
+            return # No more results
+        cache.store_papers([paper.model_dump() for paper in papers])
+        for paper in papers:
+            yield paper
+        harvested += len(papers)
+        start += size
+        if len(papers) < size:
+            return # Last page reached
@@ -0,0 +1,140 @@
+# Tools/prompt_serializer.py
+"""
+Compact, token-efficient rendering of structured data for prompts.
+
+`str(model)` on a Pydantic object produces a Python repr full of quotes,
+class names and escaped newlines, all of which cost tokens and tell the model
+nothing. `serialize_for_prompt` renders models, lists and dicts as short
+indented `field: value` lines instead, can project the output down to the
+fields a prompt actually needs, drops empty values and exact duplicate list
+items, and reports how many tokens the result costs.
+"""
+import json
+from typing import Any, Iterable, List, Optional
+
+from pydantic import BaseModel
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+class SerializedPrompt(BaseModel):
+    """The rendered text plus its size, for measuring prompt cost."""
+    text: str
+    tokens: int
+    repr_tokens: int
+    duplicates_removed: int = 0
+
+    @property
+    def savings(self) -> float:
+        """The fraction of tokens saved compared to `str(value)`."""
+        return 1 - self.tokens / self.repr_tokens if self.repr_tokens else 0.0
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """
+    Counts tokens with `tiktoken` when it is installed, otherwise estimates
+    them at roughly four characters per token.
+    """
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+class _Renderer:
+    def __init__(self, include: Optional[Iterable[str]], exclude: Optional[Iterable[str]], max_field_chars: Optional[int]):
+        self.include = set(include) if include else None
+        self.exclude = set(exclude or ())
+        self.max_field_chars = max_field_chars
+        self.duplicates_removed = 0
+
+    def _keep(self, field: str, value: Any) -> bool:
+        if field in self.exclude or value is None or value == "" or value == [] or value == {}:
+            return False
+        # Projection only applies to leaf fields; containers are kept so their children can match.
+        if self.include is not None and not isinstance(value, (BaseModel, dict, list, tuple)):
+            return field in self.include
+        return True
+
+    def _scalar(self, value: Any) -> str:
+        text = " ".join(str(value).split()) # Collapse newlines and runs of spaces
+        if self.max_field_chars and len(text) > self.max_field_chars:
+            text = text[: self.max_field_chars - 1].rstrip() + "…"
+        return text
+
+    def render(self, value: Any, indent: int = 0) -> List[str]:
+        pad = "  " * indent
+        if isinstance(value, BaseModel):
+            value = {name: getattr(value, name) for name in type(value).model_fields}
+        if isinstance(value, dict):
+            lines = []
+            for field, item in value.items():
+                if not self._keep(str(field), item):
+                    continue
+                if isinstance(item, (BaseModel, dict, list, tuple)):
+                    children = self.render(item, indent + 1)
+                    if children:
+                        lines.append(f"{pad}{field}:")
+                        lines.extend(children)
+                else:
+                    lines.append(f"{pad}{field}: {self._scalar(item)}")
+            return lines
+        if isinstance(value, (list, tuple)):
+            lines, seen = [], set()
+            for item in value:
+                children = self.render(item, indent + 1)
+                if not children:
+                    continue
+                key = "\n".join(line.strip() for line in children)
+                if key in seen:
+                    self.duplicates_removed += 1
+                    continue
+                seen.add(key)
+                # Put the first field on the bullet line: "- title: ...".
+                lines.append(f"{pad}- {children[0].strip()}")
+                lines.extend(children[1:])
+            return lines
+        if isinstance(value, str) and indent == 0:
+            # Free text (e.g. a markdown research summary): keep its line structure,
+            # only trimming trailing spaces and runs of blank lines.
+            lines = [line.rstrip() for line in value.strip().splitlines()]
+            return [line for i, line in enumerate(lines) if line or (i and lines[i - 1])]
+        return [f"{pad}{self._scalar(value)}"]
+
+
+def serialize_for_prompt(
+    value: Any,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    max_field_chars: Optional[int] = None,
+    model: str = "gpt-4o-mini",
+) -> SerializedPrompt:
+    """
+    Renders `value` (a Pydantic model, dict, list or plain text) for a prompt.
+
+    Args:
+        include: If given, only leaf fields with these names are rendered.
+        exclude: Field names that are never rendered.
+        max_field_chars: Truncates long field values to this many characters.
+        model: The model whose tokenizer is used for the token counts.
+    """
+    renderer = _Renderer(include, exclude, max_field_chars)
+    text = "\n".join(renderer.render(value))
+    if isinstance(value, BaseModel):
+        raw = str(value)
+    elif isinstance(value, str):
+        raw = value
+    else:
+        raw = json.dumps(value, default=str)
+    return SerializedPrompt(
+        text=text,
+        tokens=count_tokens(text, model),
+        repr_tokens=count_tokens(raw, model),
+        duplicates_removed=renderer.duplicates_removed,
+    )
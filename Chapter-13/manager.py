@@ -1,23 +1,122 @@
 # manager.py
+import asyncio
+from typing import AsyncIterator, List
 from agents import Runner
 from rich.console import Console
 from Agents.search_agent import search_agent
+from Agents.summarizer_agent import summarizer_agent
 from Agents.writer_agent import writer_agent
+from Tools.arxiv_tool import ArxivPaper, ArxivSearchResult, harvest_arxiv
+from Tools.prompt_serializer import serialize_for_prompt
 
 class ResearchManager:
-    def __init__(self):
+    def __init__(
+        self,
+        batch_size: int = 8,
+        concurrency: int = 4,
+        merge_fan_in: int = 4,
+        max_papers: int | None = None,
+        prompt_fields: tuple = ("title", "published_date", "summary"),
+        max_field_chars: int | None = None,
+    ):
+        """
+        Papers are summarized in batches of `batch_size`, with at most
+        `concurrency` summarizer calls in flight. Partial summaries are then
+        merged `merge_fan_in` at a time until one remains, so the writer's
+        prompt stays the same size however many papers were found.
+        If `max_papers` is set, that many papers are harvested directly from
+        ArXiv instead of asking the search agent.
+        Only `prompt_fields` of each paper are sent to the models, and field
+        values can be cut to `max_field_chars` to bound prompt size further.
+        """
         self.console = Console()
         self.searcher = search_agent
+        self.summarizer = summarizer_agent
         self.writer = writer_agent
+        self.batch_size = batch_size
+        self.merge_fan_in = max(2, merge_fan_in)
+        self.max_papers = max_papers
+        self.prompt_fields = prompt_fields
+        self.max_field_chars = max_field_chars
+        self.prompt_tokens = 0 # Tokens of paper data sent to the models, for measuring cost
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _stream_papers(self, query: str) -> AsyncIterator[ArxivPaper]:
+        """Yields the papers to report on, via bulk harvesting (as pages arrive) or the search agent."""
+        if self.max_papers:
+            async for paper in harvest_arxiv(query, total=self.max_papers):
+                yield paper
+            return
+        research_result = await Runner.run(self.searcher, query)
+        output = research_result.final_output
+        for paper in output.papers if isinstance(output, ArxivSearchResult) else []:
+            yield paper
+
+    def _format_papers(self, papers: List[ArxivPaper]) -> str:
+        """Renders papers as compact, deduplicated text instead of their Pydantic repr."""
+        serialized = serialize_for_prompt(
+            papers, include=self.prompt_fields, max_field_chars=self.max_field_chars
+        )
+        self.prompt_tokens += serialized.tokens
+        return serialized.text
+
+    async def _summarize(self, query: str, material: str) -> str:
+        """One map or reduce step, throttled by the concurrency limit."""
+        async with self._semaphore:
+            result = await Runner.run(
+                self.summarizer, f"Research topic: '{query}'\n\n{material}"
+            )
+        return str(result.final_output)
+
+    async def _map_reduce(self, query: str, papers: AsyncIterator[ArxivPaper]) -> tuple[str | None, int]:
+        """
+        Summarizes papers in batches as they stream in, then merges the
+        summaries hierarchically. Each batch is summarized as soon as it is
+        full, while later pages are still downloading. Returns the research
+        summary (None if there were no papers) and the number of papers.
+        """
+        # Map: one summary per batch of papers, started as soon as the batch is known to be full.
+        tasks: List[asyncio.Task] = []
+        batch: List[ArxivPaper] = []
+        count = 0
+        try:
+            async for paper in papers:
+                if len(batch) == self.batch_size: # More papers follow, so this batch is final.
+                    tasks.append(asyncio.create_task(self._summarize(query, self._format_papers(batch))))
+                    batch = []
+                batch.append(paper)
+                count += 1
+            if not tasks:
+                return (self._format_papers(batch) if batch else None), count # Small enough to send as-is.
+            tasks.append(asyncio.create_task(self._summarize(query, self._format_papers(batch))))
+            self.console.print(f"Summarizing {count} papers in {len(tasks)} batches...")
+            summaries = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        # Reduce: merge groups of summaries until a single one is left.
+        while len(summaries) > 1:
+            groups = [summaries[i:i + self.merge_fan_in] for i in range(0, len(summaries), self.merge_fan_in)]
+            self.console.print(f"Merging {len(summaries)} summaries into {len(groups)}...")
+            summaries = await asyncio.gather(
+                *(self._summarize(query, "\n\n---\n\n".join(group)) for group in groups)
+            )
+        return summaries[0], count
 
     async def run(self, query: str):
         self.console.rule("[bold blue]ArXiv Research Scout Initialized[/bold blue]")
         self.console.print(f"Running query: '{query}'")
 
-        # Step 1: Research
-        self.console.print("\n[bold green]Step 1: Searching ArXiv...[/bold green]")
-        research_result = await Runner.run(self.searcher, query)
-        research_summary = str(research_result.final_output)
+        # Steps 1 & 2: Research and condense. Papers are summarized while the search is still streaming them in.
+        self.console.print("\n[bold green]Step 1: Searching ArXiv and condensing the research...[/bold green]")
+        research_summary, paper_count = await self._map_reduce(query, self._stream_papers(query))
+        if research_summary is None:
+            self.console.print(f"[yellow]No papers found for '{query}'. Halting.[/yellow]")
+            return
+        self.console.print(f"Found {paper_count} papers.")
+        self.console.print(f"[grey50]Paper data sent to models: {self.prompt_tokens} tokens.[/grey50]")
 
         # Step 2: Write & Save
         self.console.print("\n[bold green]Step 2: Synthesizing and Saving Report...[/bold green]")
@@ -28,4 +127,4 @@ class ResearchManager:
         confirmation_message = str(writer_result.final_output)
 
         self.console.rule("[bold magenta]Workflow Complete[/bold magenta]")
-        self.console.print(f"✅ {confirmation_message}")
\ No newline at end of file
+        self.console.print(f"✅ {confirmation_message}")
@@ -0,0 +1,14 @@
+# agents/comment_agent.py
+from agents import Agent
+from Tools.github_tool import AnalysisComments
+
+comment_agent = Agent(
+    name="AnalysisCommentAgent",
+    instructions=(
+        "You are a software analyst. You will be given pre-computed commit activity and file "
+        "structure metrics for one GitHub repository. Do not recompute or question the numbers. "
+        "Write one brief, insightful sentence about the activity and one about the structure."
+    ),
+    output_type=AnalysisComments,
+    model="gpt-4o-mini",
+)
@@ -13,9 +13,12 @@ search_agent = Agent(
     name="GitHubSearchAgent",
     instructions=(
         "Your only job is to call the `search_github_for_trending_repos` tool "
-        "using the user's provided topic and return its structured result."
+        "using the user's provided topic and return its structured result. "
+        "If a `max_results` value is given, pass it to the tool unchanged."
     ),
     tools=[search_github_for_trending_repos],
-    
+    # The tool's GitHubSearchResult becomes the final output as is, so the model
+    # never has to re-emit every repository record as output tokens.
+    tool_use_behavior="stop_on_first_tool",
     output_type=GitHubSearchResult,
 )
\ No newline at end of file
@@ -6,7 +6,8 @@ structure_agent = Agent(
     name="StructureAgent",
     instructions=(
         "You are an analyst specializing in software architecture. Your sole purpose is to "
-        "examine a project's file structure and produce a structured analysis of its maturity."
+        "examine a project's file structure and produce a structured analysis of its maturity. "
+        "The tool reports whether tests were found; copy that into `has_tests` rather than guessing."
     ),
     tools=[get_project_structure],
 
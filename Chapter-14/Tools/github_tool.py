@@ -1,11 +1,86 @@
 # tools/github_tool.py
 import os
-import requests
+import json
+import asyncio
+import httpx
 import base64
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from agents import function_tool
 from pydantic import BaseModel, Field
 from typing import List
+from collections import deque
+from Tools.http_client import get_http_client
+from Tools.tree_walker import TreeMetrics, TreeMetricsBuilder, TreeStreamResult, iter_tree_entries
+
+# The search API never returns more than 1,000 results for a single query.
+GITHUB_SEARCH_MAX_RESULTS = 1000
+# How many README lookups may run at the same time during a search.
+README_DISCOVERY_CONCURRENCY = 10
+# Page size used when counting commits (the REST API maximum).
+COMMITS_PER_PAGE = 100
+# How many repositories are packed into one GraphQL activity query.
+GRAPHQL_BATCH_SIZE = 50
+# Override with GITHUB_API_URL to point the tools at GitHub Enterprise or a local mock.
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL_URL = f"{GITHUB_API_URL}/graphql"
+
+# --- Rate Limiting & Caching ---
+# The manager installs a shared token bucket here so every GitHub call made by
+# any agent draws from the same budget. Without one, calls are not throttled.
+# It can also install a `ResponseCache`, so repeated scans revalidate with ETags
+# (304 responses do not count against GitHub's rate limit).
+_rate_limiter = None
+_response_cache = None
+
+def set_rate_limiter(limiter) -> None:
+    """Installs the rate limiter (e.g. a `TokenBucket`) used for all GitHub API calls."""
+    global _rate_limiter
+    _rate_limiter = limiter
+
+def set_response_cache(cache) -> None:
+    """Installs the `ResponseCache` used for GitHub GET requests (None disables caching)."""
+    global _response_cache
+    _response_cache = cache
+
+def set_github_api_url(url: str) -> None:
+    """Points every tool at another API root (e.g. a local mock); overrides GITHUB_API_URL."""
+    global GITHUB_API_URL, GITHUB_GRAPHQL_URL
+    GITHUB_API_URL = url.rstrip("/")
+    GITHUB_GRAPHQL_URL = f"{GITHUB_API_URL}/graphql"
+
+async def _github_get(url: str, params: dict | None = None, headers: dict | None = None, use_cache: bool = True) -> httpx.Response:
+    """
+    Sends a GET through the shared pooled client, after waiting for the GitHub
+    rate limiter. Goes through the response cache when one is installed.
+    """
+    if _response_cache is not None and use_cache:
+        # Fresh cache hits never reach the network, so they skip the rate limiter.
+        cached = _response_cache.peek_fresh(url, params)
+        if cached is not None:
+            return cached
+    if _rate_limiter is not None:
+        await _rate_limiter.acquire()
+    if _response_cache is not None and use_cache:
+        return await _response_cache.get(get_http_client(), url, params=params, headers=headers)
+    return await get_http_client().get(url, params=params, headers=headers)
+
+async def _github_stream_summary(url: str, summarize, params: dict | None = None, headers: dict | None = None):
+    """
+    Streams a large GET response into `summarize(response)` and returns its
+    summary, after waiting for the rate limiter. With a response cache
+    installed, only the summary is cached and later calls revalidate it with
+    the stored ETag, so an unchanged response is never downloaded again.
+    """
+    if _response_cache is not None:
+        cached = _response_cache.peek_fresh_summary(url, params)
+        if cached is not None:
+            return cached
+    if _rate_limiter is not None:
+        await _rate_limiter.acquire()
+    if _response_cache is not None:
+        return await _response_cache.stream_summary(get_http_client(), url, summarize, params=params, headers=headers)
+    async with get_http_client().stream("GET", url, params=params, headers=headers) as response:
+        return await summarize(response)
 
 class GitHubRepo(BaseModel):
     """A data structure for a single GitHub repository."""
@@ -37,13 +112,87 @@ class StructureAnalysis(BaseModel):
     has_tests: bool = Field(description="Indicates if test files were found.")
     comment: str = Field(description="A brief comment on the project's structure.")
 
+class AnalysisComments(BaseModel):
+    """Free-text comments written by an LLM for pre-computed analyses."""
+    activity_comment: str = Field(description="A brief comment on the activity level.")
+    structure_comment: str = Field(description="A brief comment on the project's structure.")
+
+
+# --- Deterministic Analysis ---
+# These rules turn raw API data straight into the structured analyses, so the
+# activity and structure agents do not need a model round-trip for them.
+# Commit-count thresholds (per 14 days) for each activity level, highest first.
+ACTIVITY_LEVELS = [(50, "High"), (10, "Moderate"), (1, "Low"), (0, "Inactive")]
+
+def build_activity_analysis(commit_count: int) -> ActivityAnalysis:
+    """Classifies a 14-day commit count into an `ActivityAnalysis`."""
+    level = next(name for threshold, name in ACTIVITY_LEVELS if commit_count >= threshold)
+    comment = {
+        "High": f"Very active: {commit_count} commits in the last 14 days suggests ongoing, rapid development.",
+        "Moderate": f"Steady development with {commit_count} commits in the last 14 days.",
+        "Low": f"Only {commit_count} commit(s) in the last 14 days; development is slow.",
+        "Inactive": "No commits in the last 14 days.",
+    }[level]
+    return ActivityAnalysis(activity_level=level, recent_commit_count=commit_count, comment=comment)
+
+def build_structure_analysis(metrics: TreeMetrics) -> StructureAnalysis:
+    """
+    Scores code maturity (1-10) from tree metrics: project size, the presence
+    of tests, a non-trivial directory layout, and supporting file types such
+    as docs and configuration.
+    """
+    score = 1
+    score += min(3, metrics.total_files // 25)      # up to +3 for size (75+ files)
+    score += 3 if metrics.has_tests else 0          # +3 for a test suite
+    score += 1 if metrics.max_depth >= 2 else 0     # +1 for a nested package layout
+    supporting = {"md", "rst", "toml", "yml", "yaml", "cfg", "json"}
+    score += min(2, len(supporting & set(metrics.files_by_extension)))  # up to +2 for docs/config
+    score = max(1, min(10, score))
+
+    tests = f"has {metrics.test_file_count} test files" if metrics.has_tests else "has no tests"
+    comment = (
+        f"{metrics.total_files} files across {metrics.total_dirs} directories "
+        f"(max depth {metrics.max_depth}); the project {tests}."
+    )
+    return StructureAnalysis(maturity_score=score, has_tests=metrics.has_tests, comment=comment)
+
+async def compute_activity_analysis(repo_full_name: str, commit_count: int | None = None) -> ActivityAnalysis | None:
+    """
+    Builds an `ActivityAnalysis` without an LLM. Pass `commit_count` if it was
+    already fetched (e.g. by `fetch_commit_activity_batch`). Returns None on API errors.
+    """
+    if commit_count is None:
+        commit_count = await count_recent_commits(repo_full_name, days=14)
+    return build_activity_analysis(commit_count) if commit_count is not None else None
+
+async def compute_structure_analysis(repo_full_name: str) -> StructureAnalysis | None:
+    """Builds a `StructureAnalysis` without an LLM. Returns None on API errors."""
+    metrics = await analyze_project_tree(repo_full_name)
+    return build_structure_analysis(metrics) if metrics is not None else None
+
 
 # --- Tool Functions ---
+async def _find_readme_url(repo_name: str, headers: dict, semaphore: asyncio.Semaphore) -> str | None:
+    """Looks up the README content API URL for one repository (None if it has no README)."""
+    async with semaphore:
+        try:
+            readme_info_res = await _github_get(f"{GITHUB_API_URL}/repos/{repo_name}/readme", headers=headers)
+            if readme_info_res.status_code == 200:
+                return readme_info_res.json().get("url")
+        except httpx.HTTPError:
+            print(f"Warning: Could not fetch README info for {repo_name}.")
+        return None
+
 @function_tool
-def search_github_for_trending_repos(topic: str) -> GitHubSearchResult:
+async def search_github_for_trending_repos(topic: str, max_results: int = 5, per_page: int = 30) -> GitHubSearchResult:
     """
     Finds trending repositories on GitHub and also discovers the direct API
     URL for each repository's README file.
+
+    Args:
+        topic: The topic to search for.
+        max_results: How many repositories to return in total.
+        per_page: How many search hits to request per page (GitHub allows up to 100).
     """
     token = os.getenv("GITHUB_API_TOKEN")
     headers = {"Authorization": f"token {token}"}
@@ -53,41 +202,55 @@ def search_github_for_trending_repos(topic: str) -> GitHubSearchResult:
     print(f"🛠️  [Tool Call] Searching GitHub for actively trending repos on: '{topic}'")
     one_week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
     query = f"{topic} in:name,description,topics created:>{one_week_ago} stars:>10"
-    params = {"q": query, "sort": "stars", "order": "desc"}
-    
+    max_results = max(1, min(max_results, GITHUB_SEARCH_MAX_RESULTS))
+    per_page = max(1, min(per_page, max_results, 100)) # Don't fetch a 100-hit page for 5 results.
+
+    # Page through the search results until we have enough hits.
+    items = []
+    page = 1
+    while len(items) < max_results:
+        params = {"q": query, "sort": "stars", "order": "desc", "per_page": per_page, "page": page}
+        try:
+            response = await _github_get(f"{GITHUB_API_URL}/search/repositories", headers=headers, params=params)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            print(f"Error connecting to GitHub API for search: {e}")
+            if not items:
+                return GitHubSearchResult(repositories=[])
+            break # Keep the pages we already have.
+        page_items = response.json().get("items", [])
+        items.extend(page_items)
+        if len(page_items) < per_page or page * per_page >= GITHUB_SEARCH_MAX_RESULTS:
+            break # Last page reached (GitHub serves at most 1000 search results)
+        page += 1
+    items = items[:max_results]
+
     try:
-        response = requests.get("https://api.github.com/search/repositories", headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        repo_list = []
-        for item in data.get("items", [])[:5]:
-            repo_name = item["full_name"]
-            readme_url = None
-            try:
-                readme_info_res = requests.get(f"https://api.github.com/repos/{repo_name}/readme", headers=headers)
-                if readme_info_res.status_code == 200:
-                    readme_url = readme_info_res.json().get("url")
-            except requests.RequestException:
-                print(f"Warning: Could not fetch README info for {repo_name}.")
-            
-            repo_list.append(GitHubRepo(
+        # Discover every README at once instead of one after another.
+        semaphore = asyncio.Semaphore(README_DISCOVERY_CONCURRENCY)
+        readme_urls = await asyncio.gather(
+            *(_find_readme_url(item["full_name"], headers, semaphore) for item in items)
+        )
+
+        repo_list = [
+            GitHubRepo(
                 name=item["full_name"],
                 html_url=item["html_url"],
                 description=item["description"],
                 stargazers_count=item["stargazers_count"],
                 language=item["language"],
                 readme_url=readme_url
-            ))
-            
+            )
+            for item, readme_url in zip(items, readme_urls)
+        ]
         return GitHubSearchResult(repositories=repo_list)
         
-    except requests.RequestException as e:
-        print(f"Error connecting to GitHub API for search: {e}")
+    except httpx.HTTPError as e:
+        print(f"Error connecting to GitHub API while discovering READMEs: {e}")
         return GitHubSearchResult(repositories=[])
 
 @function_tool
-def read_readme_from_url(readme_api_url: str) -> str:
+async def read_readme_from_url(readme_api_url: str) -> str:
     """
     Fetches the content of a README file from its direct content API URL.
     This tool takes a URL, not a repository name.
@@ -99,39 +262,158 @@ def read_readme_from_url(readme_api_url: str) -> str:
     print(f"🛠️  [Tool Call] Fetching README from direct URL: {readme_api_url}")
     headers = {"Authorization": f"token {token}"}
     try:
-        response = requests.get(readme_api_url, headers=headers)
+        response = await _github_get(readme_api_url, headers=headers)
         response.raise_for_status()
         data = response.json()
         readme_content_encoded = data['content']
         readme_content_decoded = base64.b64decode(readme_content_encoded).decode('utf-8')
         return readme_content_decoded
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Error: Could not fetch README content from URL. Reason: {e}"
     
+def _activity_since(days: int) -> str:
+    """
+    The ISO timestamp `days` ago, rounded down to midnight UTC so repeated
+    calls on the same day share one cache key.
+    """
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%dT00:00:00Z')
+
+async def count_recent_commits(repo_full_name: str, days: int = 14) -> int | None:
+    """
+    Counts the commits on the default branch in the last `days` days.
+    Instead of downloading every page, it reads the `last` page number from
+    the Link header and only fetches that final page, so the count is exact
+    with at most two requests and one page of commits in memory.
+    Returns None if the count could not be fetched.
+    """
+    token = os.getenv("GITHUB_API_TOKEN")
+    headers = {"Authorization": f"token {token}"}
+    url = f"{GITHUB_API_URL}/repos/{repo_full_name}/commits"
+    params = {"since": _activity_since(days), "per_page": COMMITS_PER_PAGE}
+    try:
+        response = await _github_get(url, headers=headers, params=params)
+        if response.status_code == 409: # Empty repository
+            return 0
+        response.raise_for_status()
+        last_link = response.links.get("last")
+        if not last_link:
+            return len(response.json()) # Everything fit on one page
+        last_page = int(httpx.URL(last_link["url"]).params["page"])
+        last_response = await _github_get(url, headers=headers, params={**params, "page": last_page})
+        last_response.raise_for_status()
+        return (last_page - 1) * COMMITS_PER_PAGE + len(last_response.json())
+    except (httpx.HTTPError, KeyError, ValueError):
+        return None
+
+async def fetch_commit_activity_batch(repo_full_names: List[str], days: int = 14) -> dict[str, int | None]:
+    """
+    Fetches recent commit counts for many repositories through the GraphQL API.
+    Repositories are packed into aliased sub-queries, so each request covers
+    up to `GRAPHQL_BATCH_SIZE` repos instead of one REST call per repo.
+    Repos that could not be resolved map to None.
+    """
+    token = os.getenv("GITHUB_API_TOKEN")
+    headers = {"Authorization": f"bearer {token}"}
+    since = json.dumps(_activity_since(days))
+    counts: dict[str, int | None] = {name: None for name in repo_full_names}
+
+    for offset in range(0, len(repo_full_names), GRAPHQL_BATCH_SIZE):
+        batch = repo_full_names[offset:offset + GRAPHQL_BATCH_SIZE]
+        sub_queries = []
+        for i, full_name in enumerate(batch):
+            owner, _, name = full_name.partition("/")
+            sub_queries.append(
+                f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ "
+                f"defaultBranchRef {{ target {{ ... on Commit {{ history(since: {since}) {{ totalCount }} }} }} }} }}"
+            )
+        query = "query { " + " ".join(sub_queries) + " }"
+
+        if _rate_limiter is not None:
+            await _rate_limiter.acquire()
+        try:
+            response = await get_http_client().post(GITHUB_GRAPHQL_URL, headers=headers, json={"query": query})
+            response.raise_for_status()
+            data = response.json().get("data") or {}
+        except httpx.HTTPError as e:
+            print(f"Warning: GraphQL commit activity batch failed: {e}")
+            continue
+
+        for i, full_name in enumerate(batch):
+            repo = data.get(f"r{i}") or {}
+            target = (repo.get("defaultBranchRef") or {}).get("target") or {}
+            history = target.get("history")
+            if history is not None:
+                counts[full_name] = history["totalCount"]
+    return counts
+
 @function_tool
-def get_commit_activity(repo_full_name: str) -> str:
+async def get_commit_activity(repo_full_name: str) -> str:
     """Fetches the number of commits in the last 14 days to gauge recent activity."""
-    token = os.getenv("GITHUB_API_TOKEN"); headers = {"Authorization": f"token {token}"}
+    token = os.getenv("GITHUB_API_TOKEN")
     if not token: return "Error: GITHUB_API_TOKEN not set."
     print(f"🛠️  [Tool Call] Fetching commit activity for: '{repo_full_name}'")
-    since_date = (datetime.now() - timedelta(days=14)).isoformat()
+    commit_count = await count_recent_commits(repo_full_name, days=14)
+    if commit_count is None: return "Could not fetch commit activity."
+    return f"Found {commit_count} commits in the last 14 days."
+
+async def _walk_tree_by_directory(repo_full_name: str, headers: dict, max_requests: int) -> TreeMetrics:
+    """
+    Fallback for trees GitHub truncates: walks the repository one directory at
+    a time with non-recursive tree requests, breadth first, up to `max_requests`.
+    """
+    builder = TreeMetricsBuilder()
+    pending = deque([("HEAD", "")])
+    requests_made = 0
+    while pending and requests_made < max_requests:
+        tree_sha, prefix = pending.popleft()
+        response = await _github_get(f"{GITHUB_API_URL}/repos/{repo_full_name}/git/trees/{tree_sha}", headers=headers)
+        response.raise_for_status()
+        requests_made += 1
+        for entry in response.json().get("tree", []):
+            path = f"{prefix}{entry['path']}"
+            builder.add(path, entry["type"])
+            if entry["type"] == "tree":
+                pending.append((entry["sha"], f"{path}/"))
+    return builder.build(complete=not pending)
+
+async def _summarize_tree(response: httpx.Response) -> dict:
+    """Folds a streamed recursive tree response into its metrics (the cached summary)."""
+    if response.status_code == 409: # Empty repository
+        return {"metrics": TreeMetrics().model_dump(mode="json"), "truncated": False}
+    response.raise_for_status()
+    builder = TreeMetricsBuilder()
+    stream_result = TreeStreamResult()
+    async for entry in iter_tree_entries(response.aiter_bytes(), stream_result):
+        builder.add(entry["path"], entry["type"])
+    return {"metrics": builder.build().model_dump(mode="json"), "truncated": stream_result.truncated}
+
+async def analyze_project_tree(repo_full_name: str, max_fallback_requests: int = 200) -> TreeMetrics | None:
+    """
+    Computes structural metrics for a repository's default branch.
+    The recursive tree is streamed and parsed entry by entry, so memory use
+    does not grow with repository size. Only the metrics are cached (with the
+    tree's ETag), so a rerun revalidates instead of downloading the tree again.
+    If GitHub truncates the recursive listing, it falls back to a
+    per-directory walk. Returns None on API errors.
+    """
+    token = os.getenv("GITHUB_API_TOKEN")
+    headers = {"Authorization": f"token {token}"}
+    url = f"{GITHUB_API_URL}/repos/{repo_full_name}/git/trees/HEAD"
     try:
-        response = requests.get(f"https://api.github.com/repos/{repo_full_name}/commits", headers=headers, params={"since": since_date})
-        response.raise_for_status(); commits = response.json()
-        return f"Found {len(commits)} commits in the last 14 days."
-    except requests.RequestException: return "Could not fetch commit activity."
+        summary = await _github_stream_summary(url, _summarize_tree, params={"recursive": "1"}, headers=headers)
+        if not summary["truncated"]:
+            return TreeMetrics.model_validate(summary["metrics"])
+        print(f"🛠️  [Tool Call] Tree for '{repo_full_name}' is truncated; walking it directory by directory.")
+        return await _walk_tree_by_directory(repo_full_name, headers, max_fallback_requests)
+    except (httpx.HTTPError, KeyError):
+        return None
 
 @function_tool
-def get_project_structure(repo_full_name: str) -> str:
+async def get_project_structure(repo_full_name: str) -> str:
     """Fetches the file and directory structure of a repository to assess its maturity."""
-    token = os.getenv("GITHUB_API_TOKEN"); headers = {"Authorization": f"token {token}"}
+    token = os.getenv("GITHUB_API_TOKEN")
     if not token: return "Error: GITHUB_API_TOKEN not set."
     print(f"🛠️  [Tool Call] Fetching project structure for: '{repo_full_name}'")
-    try:
-        response = requests.get(f"https://api.github.com/repos/{repo_full_name}/git/trees/main?recursive=1", headers=headers)
-        if response.status_code == 404: # Fallback for 'master'
-             response = requests.get(f"https://api.github.com/repos/{repo_full_name}/git/trees/master?recursive=1", headers=headers)
-        response.raise_for_status(); data = response.json()
-        if data.get("truncated"): return "Project is too large to fully list, a sign of high maturity."
-        paths = [item['path'] for item in data.get('tree', [])]; return f"Found {len(paths)} files and directories." if paths else "Project appears empty."
-    except requests.RequestException: return "Could not determine project structure."
\ No newline at end of file
+    metrics = await analyze_project_tree(repo_full_name)
+    if metrics is None: return "Could not determine project structure."
+    return metrics.describe()
@@ -0,0 +1,100 @@
+# Tools/http_client.py
+"""
+A shared, pooled async HTTP client for all tools.
+
+Creating a new connection per request means a fresh TCP + TLS handshake every
+time, and a blocking client stalls the event loop while "parallel" agents wait.
+Every tool goes through one `httpx.AsyncClient` instead, which keeps
+connections alive, uses HTTP/2 when the optional `h2` package is installed,
+and applies the same timeouts everywhere.
+"""
+import asyncio
+import httpx
+
+try:
+    import h2  # noqa: F401 -- only needed to enable HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# --- Client Settings ---
+# Tweak these with `configure_http_client()` before the first request.
+_settings = {
+    "timeout": 20.0,
+    "connect_timeout": 5.0,
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "http2": HTTP2_AVAILABLE,
+}
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+_retiring: set[asyncio.Future] = set() # Keeps the close tasks of replaced clients alive until they finish
+
+
+def configure_http_client(**settings) -> None:
+    """
+    Overrides client settings (timeout, connect_timeout, max_connections,
+    max_keepalive_connections, http2). Takes effect for the next client created.
+    """
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown HTTP client settings: {', '.join(sorted(unknown))}")
+    if settings.get("http2") and not HTTP2_AVAILABLE:
+        raise ValueError("HTTP/2 requested but the 'h2' package is not installed.")
+    _settings.update(settings)
+
+
+async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+    try:
+        await client.aclose()
+    except RuntimeError:
+        # The client's own loop is closed, so its sockets cannot be shut down cleanly.
+        # The client is marked closed anyway and drops them, which releases them.
+        pass
+
+
+def _retire_client(client: httpx.AsyncClient, client_loop: asyncio.AbstractEventLoop) -> None:
+    """Closes a client created in another event loop, on that loop if it is still running."""
+    if client.is_closed:
+        return
+    if client_loop.is_running() and not client_loop.is_closed():
+        future = asyncio.run_coroutine_threadsafe(_aclose_quietly(client), client_loop)
+    else:
+        future = asyncio.get_running_loop().create_task(_aclose_quietly(client))
+    _retiring.add(future)
+    future.add_done_callback(_retiring.discard)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared client, creating it on first use.
+    A client is bound to the event loop it was created in, so a new one is
+    made if the caller is running in a different loop; the old one is closed
+    rather than left holding its pooled connections.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        if _client is not None and _client_loop is not loop:
+            _retire_client(_client, _client_loop)
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(_settings["timeout"], connect=_settings["connect_timeout"]),
+            limits=httpx.Limits(
+                max_connections=_settings["max_connections"],
+                max_keepalive_connections=_settings["max_keepalive_connections"],
+            ),
+            http2=_settings["http2"],
+            follow_redirects=True,
+        )
+        _client_loop = loop
+    return _client
+
+
+async def aclose_http_client() -> None:
+    """Closes the shared client and its pooled connections."""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
@@ -0,0 +1,217 @@
+# Tools/response_cache.py
+"""
+An on-disk cache of GitHub API responses with conditional revalidation.
+
+Each response is stored with its ETag / Last-Modified headers. Within the TTL
+it is served straight from disk. After the TTL, the next request is sent with
+`If-None-Match` / `If-Modified-Since`; a `304 Not Modified` reply refreshes the
+entry without downloading the body again, and GitHub does not count 304s
+against the rate limit. The cache is bounded in size and evicts the least
+recently used entries first.
+
+Responses too large to keep (e.g. a recursive git tree) go through
+`stream_summary` instead: the body is streamed into a summarizing function
+and only its small JSON summary is stored, revalidated the same way.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), '..', '.cache', 'github_responses.db')
+
+# Only these response headers are kept; the rest are not needed to replay a response.
+_STORED_HEADERS = ("content-type", "etag", "last-modified", "link")
+# Summaries are stored next to (never instead of) full responses for the same URL.
+_SUMMARY_SUFFIX = "#summary"
+
+
+class ResponseCache:
+    """A size-bounded LRU cache of GET responses, keyed by URL and query params."""
+    def __init__(self, path: str = CACHE_PATH, ttl_seconds: float = 3600, max_bytes: int = 50 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """Builds a stable cache key from the URL and (sorted) query params."""
+        if not params:
+            return url
+        return f"{url}?{json.dumps(params, sort_keys=True, default=str)}"
+
+    def _load(self, key: str):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _touch(self, key: str, refreshed: bool):
+        now = time.time()
+        with self._lock, self._conn:
+            if refreshed:
+                self._conn.execute(
+                    "UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key)
+                )
+            else:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+
+    def _store(self, key: str, response_headers: httpx.Headers, body: bytes):
+        headers = {name: response_headers[name] for name in _STORED_HEADERS if name in response_headers}
+        if "etag" not in headers and "last-modified" not in headers and self.ttl_seconds <= 0:
+            return  # Nothing to revalidate with and no TTL: caching would never pay off.
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, headers, body, size, stored_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(headers), body, len(body), now, now),
+            )
+        self._evict()
+
+    def _evict(self):
+        """Drops least-recently-used entries until the cache fits in `max_bytes`."""
+        with self._lock, self._conn:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, size in self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC"
+            ).fetchall():
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.stats["evictions"] += 1
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    @staticmethod
+    def _replay(url: str, headers_json: str, body: bytes) -> httpx.Response:
+        return httpx.Response(
+            200, headers=json.loads(headers_json), content=body, request=httpx.Request("GET", url)
+        )
+
+    @staticmethod
+    def _conditional_headers(cached, headers: Optional[Dict]) -> Dict:
+        """The request headers, plus the stored validators of `cached` if there is an entry."""
+        request_headers = dict(headers or {})
+        if cached:
+            validators = json.loads(cached[0])
+            if "etag" in validators:
+                request_headers["If-None-Match"] = validators["etag"]
+            if "last-modified" in validators:
+                request_headers["If-Modified-Since"] = validators["last-modified"]
+        return request_headers
+
+    def _load_fresh(self, key: str):
+        cached = self._load(key)
+        if cached and time.time() - cached[2] < self.ttl_seconds:
+            self.stats["hits"] += 1
+            self._touch(key, refreshed=False)
+            return cached
+        return None
+
+    def peek_fresh(self, url: str, params: Optional[Dict] = None) -> Optional[httpx.Response]:
+        """Returns the cached response if it is still within the TTL, without any network call."""
+        cached = self._load_fresh(self.make_key(url, params))
+        return self._replay(url, cached[0], cached[1]) if cached else None
+
+    async def get(self, client: httpx.AsyncClient, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> httpx.Response:
+        """
+        Performs a cached GET. Only successful (200) responses are stored, so
+        errors are always retried against the network.
+        """
+        fresh = self.peek_fresh(url, params)
+        if fresh is not None:
+            return fresh
+
+        key = self.make_key(url, params)
+        cached = self._load(key)
+        response = await client.get(url, params=params, headers=self._conditional_headers(cached, headers))
+
+        if cached and response.status_code == 304:
+            self.stats["revalidated"] += 1
+            self._touch(key, refreshed=True)
+            return self._replay(url, cached[0], cached[1])
+
+        self.stats["misses"] += 1
+        if response.status_code == 200:
+            self._store(key, response.headers, response.content)
+        return response
+
+    # --- Summaries of streamed responses ---
+    def peek_fresh_summary(self, url: str, params: Optional[Dict] = None) -> Any:
+        """Returns the summary stored by `stream_summary` if it is still within the TTL, else None."""
+        cached = self._load_fresh(self.make_key(url, params) + _SUMMARY_SUFFIX)
+        return json.loads(cached[1]) if cached else None
+
+    async def stream_summary(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        summarize: Callable[[httpx.Response], Awaitable[Any]],
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> Any:
+        """
+        A cached, streamed GET for responses too large to store. The open
+        response is passed to `summarize`, which consumes the body and returns
+        a JSON-serializable summary; only that summary is stored, with the
+        response's validators. A later request within the TTL returns it
+        without a network call, and after the TTL a `304` returns it without
+        downloading the body again. `summarize` also sees non-200 responses
+        (and may raise for them); their summaries are not stored.
+        """
+        fresh = self.peek_fresh_summary(url, params)
+        if fresh is not None:
+            return fresh
+
+        key = self.make_key(url, params) + _SUMMARY_SUFFIX
+        cached = self._load(key)
+        async with client.stream("GET", url, params=params, headers=self._conditional_headers(cached, headers)) as response:
+            if cached and response.status_code == 304:
+                self.stats["revalidated"] += 1
+                self._touch(key, refreshed=True)
+                return json.loads(cached[1])
+
+            self.stats["misses"] += 1
+            summary = await summarize(response)
+            if response.status_code == 200:
+                self._store(key, response.headers, json.dumps(summary).encode("utf-8"))
+            return summary
+
+    def summary(self) -> str:
+        """A one-line, human-readable report of cache effectiveness."""
+        total = self.stats["hits"] + self.stats["revalidated"] + self.stats["misses"]
+        served = self.stats["hits"] + self.stats["revalidated"]
+        ratio = (served / total * 100) if total else 0.0
+        return (
+            f"{self.stats['hits']} hits, {self.stats['revalidated']} revalidated (304), "
+            f"{self.stats['misses']} misses, {self.stats['evictions']} evictions "
+            f"({ratio:.0f}% served from cache)"
+        )
+
+    def close(self):
+        self._conn.close()
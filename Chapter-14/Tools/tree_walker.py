@@ -0,0 +1,148 @@
+# Tools/tree_walker.py
+"""
+Incremental parsing and bounded-memory metrics for GitHub git trees.
+
+A recursive tree response for a large repository can be tens of megabytes.
+Instead of loading it with `response.json()` and building a list of every
+path, `iter_tree_entries` decodes the entries of the `"tree"` array one at a
+time as bytes arrive, and `TreeMetricsBuilder` folds each entry into a few
+counters. Memory stays proportional to one entry, not to the repository.
+"""
+import codecs
+import json
+import re
+from collections import Counter
+from typing import AsyncIterator, Dict
+
+from pydantic import BaseModel, Field
+
+# Directory names and file patterns that indicate a test suite.
+TEST_DIR_NAMES = {"test", "tests", "__tests__", "spec", "specs", "testing"}
+TEST_FILE_PATTERN = re.compile(r"(^test_.*\.py$|_test\.(py|go|rs)$|\.(test|spec)\.[jt]sx?$|Test\.java$)")
+# Beyond this many distinct extensions, the rarest ones are grouped as "other".
+MAX_TRACKED_EXTENSIONS = 50
+
+_TREE_ARRAY_START = re.compile(r'"tree"\s*:\s*\[')
+_TRUNCATED_TRUE = re.compile(r'"truncated"\s*:\s*true')
+
+
+class TreeMetrics(BaseModel):
+    """Structural metrics computed from a repository's file tree."""
+    total_files: int = 0
+    total_dirs: int = 0
+    max_depth: int = 0
+    depth_histogram: Dict[int, int] = Field(default_factory=dict, description="Number of files at each directory depth.")
+    files_by_extension: Dict[str, int] = Field(default_factory=dict)
+    has_tests: bool = False
+    test_file_count: int = 0
+    complete: bool = Field(default=True, description="False if the walk stopped early because of a request budget.")
+
+    def describe(self) -> str:
+        """A compact text summary suitable for an agent's tool output."""
+        if not self.total_files and not self.total_dirs:
+            return "Project appears empty."
+        top_extensions = ", ".join(
+            f"{ext} ({count})" for ext, count in sorted(self.files_by_extension.items(), key=lambda kv: -kv[1])[:5]
+        )
+        depths = ", ".join(f"{depth}: {count}" for depth, count in sorted(self.depth_histogram.items()))
+        return (
+            f"Found {self.total_files} files in {self.total_dirs} directories"
+            f"{'' if self.complete else ' (partial walk)'}. "
+            f"Max depth: {self.max_depth}. Files per depth: {depths}. "
+            f"Top extensions: {top_extensions or 'none'}. "
+            f"Tests: {'yes' if self.has_tests else 'no'} ({self.test_file_count} test files)."
+        )
+
+
+class TreeMetricsBuilder:
+    """Accumulates `TreeMetrics` one tree entry at a time."""
+    def __init__(self):
+        self.metrics = TreeMetrics()
+        self._depths: Counter = Counter()
+        self._extensions: Counter = Counter()
+
+    def add(self, path: str, entry_type: str) -> None:
+        parts = path.split("/")
+        depth = len(parts) - 1
+        if entry_type == "tree":
+            self.metrics.total_dirs += 1
+            if parts[-1].lower() in TEST_DIR_NAMES:
+                self.metrics.has_tests = True
+            return
+        if entry_type != "blob":
+            return # Submodules ("commit" entries) are not files of this repo.
+
+        self.metrics.total_files += 1
+        self.metrics.max_depth = max(self.metrics.max_depth, depth)
+        self._depths[depth] += 1
+
+        name = parts[-1]
+        ext = name.rsplit(".", 1)[-1].lower() if "." in name[1:] else "(none)"
+        if ext in self._extensions or len(self._extensions) < MAX_TRACKED_EXTENSIONS:
+            self._extensions[ext] += 1
+        else:
+            self._extensions["other"] += 1
+
+        in_test_dir = any(part.lower() in TEST_DIR_NAMES for part in parts[:-1])
+        if in_test_dir or TEST_FILE_PATTERN.search(name):
+            self.metrics.test_file_count += 1
+            self.metrics.has_tests = True
+
+    def build(self, complete: bool = True) -> TreeMetrics:
+        self.metrics.depth_histogram = dict(self._depths)
+        self.metrics.files_by_extension = dict(self._extensions)
+        self.metrics.complete = complete
+        return self.metrics
+
+
+class TreeStreamResult:
+    """Set by `iter_tree_entries` once the stream is exhausted."""
+    truncated: bool = False
+
+
+async def iter_tree_entries(chunks: AsyncIterator[bytes], result: TreeStreamResult) -> AsyncIterator[dict]:
+    """
+    Yields each object of the top-level `"tree"` array from a streamed git
+    tree response, decoding them one by one as the bytes arrive.
+    After the stream ends, `result.truncated` reflects the response's flag.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    in_array = False
+    done = False
+
+    async for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        if done:
+            continue
+        if not in_array:
+            match = _TREE_ARRAY_START.search(buffer)
+            if not match:
+                continue
+            if _TRUNCATED_TRUE.search(buffer, 0, match.start()):
+                result.truncated = True
+            buffer = buffer[match.end():]
+            in_array = True
+
+        while True:
+            buffer = buffer.lstrip(" \t\r\n,")
+            if not buffer:
+                break
+            if buffer[0] == "]":
+                buffer = buffer[1:]
+                done = True
+                break
+            try:
+                entry, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break # The entry is incomplete; wait for more bytes.
+            buffer = buffer[end:]
+            yield entry
+        if done:
+            # Only the small tail of the document (e.g. `"truncated": ...`) is kept from here on.
+            buffer = buffer[-256:]
+
+    buffer += text_decoder.decode(b"", final=True)
+    if _TRUNCATED_TRUE.search(buffer):
+        result.truncated = True
@@ -0,0 +1,227 @@
+# benchmark.py
+"""
+End-to-end throughput benchmark for the GitHub trend scout.
+
+The whole `GitHubTrendManager` pipeline runs against a local mock of the
+GitHub API (`mock_github.py`) and a scripted fake model (`fake_model.py`), so
+it needs no API keys, makes no network calls and gives repeatable numbers.
+The fake model follows each agent's instructions: the search agent calls the
+search tool, the README agent reads the README, the report agent saves its
+report (into a temporary directory).
+
+For each repository count it reports throughput (repos/sec), p50/p95 latency
+of every stage (each agent, and the investigation of one repository), the
+number of model calls and API requests, and peak memory (Python heap via
+`tracemalloc`, plus process RSS).
+
+Usage:
+    python benchmark.py                                  # 5, 50 and 500 repos
+    python benchmark.py --sizes 50 --concurrency 16 --model-latency 0.2
+    python benchmark.py --json output/benchmark.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List
+
+from agents import set_tracing_disabled
+from rich.console import Console
+from rich.table import Table
+
+from fake_model import FakeModel, FakeRequest, FakeToolCall, lognormal_latency, use_fake_model
+from manager import GitHubTrendManager
+from mock_github import MockGitHubAPI
+from Tools import file_writer_tool
+from Tools.github_tool import set_github_api_url
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """The nearest-rank percentile (q in 0..100) of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round((rss if os.uname().sysname == "Darwin" else rss * 1024) / 2**20, 1)
+
+
+class ScoutResponder:
+    """
+    Plays the part of the model for the scout's agents. Turns it does not
+    script (e.g. the README scores) fall back to the fake model's
+    schema-valid defaults.
+    """
+    def __init__(self, mock: MockGitHubAPI):
+        self.mock = mock
+
+    def __call__(self, request: FakeRequest):
+        tools = {tool.name for tool in request.tools}
+        called = request.calls_since_user_message()
+        message = request.user_message
+
+        if "search_github_for_trending_repos" in tools and not called:
+            # The search agent stops on its tool call, whose result is the agent's output.
+            max_results = int(re.search(r"max_results:\s*(\d+)", message).group(1))
+            topic = re.search(r"topic:\s*(.+)", message).group(1).strip()
+            return FakeToolCall("search_github_for_trending_repos", {"topic": topic, "max_results": max_results, "per_page": 100})
+
+        if "read_readme_from_url" in tools and not called and message.startswith("http"):
+            return FakeToolCall("read_readme_from_url", {"readme_api_url": message})
+
+        if "save_report" in tools and not called:
+            topic = re.search(r"The topic is: '([^']*)'", message)
+            content = message.split("---BEGIN PROJECT BRIEFINGS---")[-1]
+            return FakeToolCall("save_report", {"topic": topic.group(1) if topic else "benchmark", "content": content})
+        return None
+
+
+class InstrumentedTrendManager(GitHubTrendManager):
+    """The real manager, with every agent run and repository investigation timed."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.console = Console(quiet=True)
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+
+    async def _run_agent(self, agent, prompt: str):
+        started = time.perf_counter()
+        try:
+            return await super()._run_agent(agent, prompt)
+        finally:
+            self.timings[f"agent: {agent.name}"].append(time.perf_counter() - started)
+
+    async def _investigate_one_repo(self, repo, commit_count=None):
+        started = time.perf_counter()
+        try:
+            return await super()._investigate_one_repo(repo, commit_count)
+        finally:
+            self.timings["investigate one repo"].append(time.perf_counter() - started)
+
+
+async def benchmark_size(repo_count: int, mock: MockGitHubAPI, model: FakeModel, args) -> dict:
+    """Runs the pipeline once for `repo_count` repositories and returns its measurements."""
+    manager = InstrumentedTrendManager(
+        max_repos=repo_count,
+        max_concurrency=args.concurrency,
+        llm_requests_per_second=args.llm_rps,
+        github_requests_per_second=args.github_rps,
+        use_cache=args.cache,
+    )
+    use_fake_model([manager.searcher, manager.readme_analyzer, manager.activity_analyzer,
+                    manager.structure_analyzer, manager.commenter, manager.reporter], model)
+    mock.request_counts.clear()
+    calls_before = model.stats["calls"]
+
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    # The tools print a line per call; keep the benchmark output readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        await manager.run("benchmarks")
+    elapsed = time.perf_counter() - started
+    heap_peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else 0
+    if args.trace_memory:
+        tracemalloc.stop()
+
+    return {
+        "repos": repo_count,
+        "seconds": round(elapsed, 3),
+        "repos_per_second": round(repo_count / elapsed, 2),
+        "model_calls": model.stats["calls"] - calls_before,
+        "api_requests": dict(sorted(mock.request_counts.items())),
+        "peak_python_heap_mb": round(heap_peak / 2**20, 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {
+            stage: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+            }
+            for stage, values in sorted(manager.timings.items())
+        },
+    }
+
+
+def print_results(results: List[dict], console: Console) -> None:
+    summary = Table(title="GitHub trend scout throughput")
+    for column in ("Repos", "Seconds", "Repos/s", "Model calls", "API requests", "Py heap (MB)", "RSS (MB)"):
+        summary.add_column(column, justify="right")
+    for result in results:
+        summary.add_row(
+            str(result["repos"]), f"{result['seconds']:.2f}", f"{result['repos_per_second']:.2f}",
+            str(result["model_calls"]), str(sum(result["api_requests"].values())),
+            f"{result['peak_python_heap_mb']}", f"{result['peak_rss_mb']}",
+        )
+    console.print(summary)
+
+    stages = Table(title="Stage latency (p50 / p95, ms)")
+    stages.add_column("Stage")
+    for result in results:
+        stages.add_column(f"{result['repos']} repos", justify="right")
+    for stage in sorted({stage for result in results for stage in result["stages"]}):
+        row = [stage]
+        for result in results:
+            timing = result["stages"].get(stage)
+            row.append(f"{timing['p50_ms']:.0f} / {timing['p95_ms']:.0f}" if timing else "-")
+        stages.add_row(*row)
+    console.print(stages)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the trend scout against a local mock API and a fake model.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500], help="Repository counts to benchmark.")
+    parser.add_argument("--concurrency", type=int, default=4, help="The manager's max_concurrency.")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="Median fake model latency in seconds (log-normal).")
+    parser.add_argument("--api-latency", type=float, nargs=2, default=[0.01, 0.05], metavar=("LOW", "HIGH"), help="Mock API latency range in seconds.")
+    parser.add_argument("--llm-rps", type=float, default=1000.0, help="LLM rate limit (high by default, to measure the pipeline itself).")
+    parser.add_argument("--github-rps", type=float, default=1000.0, help="GitHub rate limit (use 1.4 to see the real API's ceiling).")
+    parser.add_argument("--cache", action="store_true", help="Enable the response and run caches (off by default so every run is cold).")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false", help="Skip tracemalloc, which slows Python down.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    console = Console()
+    # Nothing below may reach the real services.
+    os.environ["GITHUB_API_TOKEN"] = "benchmark-token"
+    set_tracing_disabled(True)
+
+    with MockGitHubAPI(max_repos=max(args.sizes), latency=tuple(args.api_latency), seed=args.seed) as mock, \
+            tempfile.TemporaryDirectory() as report_dir:
+        set_github_api_url(mock.base_url)
+        file_writer_tool.OUTPUT_DIR = report_dir
+        model = FakeModel(responder=ScoutResponder(mock), latency=lognormal_latency(args.model_latency), seed=args.seed)
+
+        results = []
+        for size in args.sizes:
+            with console.status(f"Benchmarking {size} repositories..."):
+                results.append(await benchmark_size(size, mock, model, args))
+            console.print(f"[grey50]{size} repos: {results[-1]['repos_per_second']} repos/s[/grey50]")
+
+    print_results(results, console)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+        console.print(f"[grey50]Results written to {args.json}[/grey50]")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
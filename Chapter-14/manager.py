@@ -1,47 +1,158 @@
 # manager.py
 import asyncio
-from agents import Runner
+from agents import RunHooks, Runner
 from rich.console import Console
 from Agents.search_agent import search_agent
 from Agents.readme_agent import readme_agent
 from Agents.activity_agent import activity_agent
 from Agents.structure_agent import structure_agent
 from Agents.report_agent import report_agent
-from Tools.github_tool import GitHubSearchResult, GitHubRepo, ReadmeAnalysis, ActivityAnalysis, StructureAnalysis
+from Agents.comment_agent import comment_agent
+from Tools.github_tool import (
+    GitHubSearchResult, GitHubRepo, ReadmeAnalysis, ActivityAnalysis, StructureAnalysis, AnalysisComments,
+    set_rate_limiter, set_response_cache,
+    compute_activity_analysis, compute_structure_analysis, fetch_commit_activity_batch,
+)
+from Tools.http_client import aclose_http_client
+from Tools.response_cache import ResponseCache
+from scheduler import TaskScheduler, TokenBucket
+from run_cache import RunCache
+
+class LLMRateLimitHooks(RunHooks):
+    """
+    Takes a token from the LLM rate limiter before every model request. A
+    tool-using agent makes several requests in one run, so limiting whole
+    runs would let it exceed the rate.
+    """
+    def __init__(self, limiter: TokenBucket):
+        self.limiter = limiter
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        await self.limiter.acquire()
 
 class GitHubTrendManager:
-    def __init__(self):
+    def __init__(
+        self,
+        max_repos: int = 5,
+        max_concurrency: int = 4,
+        llm_requests_per_second: float = 5.0,
+        github_requests_per_second: float = 1.0,
+        github_burst: int = 100,
+        cache_ttl_seconds: float = 3600,
+        use_cache: bool = True,
+        deterministic_analysis: bool = True,
+        llm_comments: bool = False,
+    ):
+        """
+        `max_repos` is how many search hits are investigated.
+        `max_concurrency` caps how many repositories are investigated at once.
+        The two rates are separate token buckets: one for model calls, one for
+        GitHub API calls (GitHub allows 5,000 authenticated requests per hour,
+        i.e. roughly 1.4 per second). The LLM rate counts every model request,
+        not every agent run. Up to `github_burst` GitHub calls may go out at
+        once before the GitHub rate applies, so a small scan is not serialised
+        to one call per second.
+        GitHub responses are cached on disk for `cache_ttl_seconds` and then
+        revalidated with ETags, and agent results are cached as well; pass
+        `use_cache=False` to always hit the API and the model.
+        With `deterministic_analysis`, activity and structure analyses are
+        computed from API data by fixed rules instead of two LLM agents; set
+        `llm_comments` to have one small LLM call per repo write their comments.
+        """
         self.console = Console()
+        self.max_repos = max_repos
+        self.deterministic_analysis = deterministic_analysis
+        self.llm_comments = llm_comments
+        self.scheduler = TaskScheduler(max_concurrency)
+        self.llm_limiter = TokenBucket(llm_requests_per_second)
+        self.llm_hooks = LLMRateLimitHooks(self.llm_limiter)
+        set_rate_limiter(TokenBucket(github_requests_per_second, capacity=github_burst))
+        self.response_cache = ResponseCache(ttl_seconds=cache_ttl_seconds) if use_cache else None
+        set_response_cache(self.response_cache)
+        # Agent results are cached too; the reporter is excluded because its
+        # `save_report` tool must actually run every time. The trending list
+        # changes, so search results expire with the GitHub responses and the
+        # next scan revalidates them instead of reusing a day-old list.
+        self.run_cache = RunCache(exclude=[report_agent], ttls={search_agent.name: cache_ttl_seconds}) if use_cache else None
         self.searcher = search_agent
         self.readme_analyzer = readme_agent
         self.activity_analyzer = activity_agent
         self.structure_analyzer = structure_agent
+        self.commenter = comment_agent
         self.reporter = report_agent
 
-    async def _investigate_one_repo(self, repo: GitHubRepo) -> tuple:
-        """Helper to run the three analysis agents in parallel for one repo."""
+    async def _run_agent(self, agent, prompt: str):
+        """Runs an agent, rate limiting each of its model requests (cache hits skip both)."""
+        if self.run_cache:
+            cached = self.run_cache.lookup(agent, prompt)
+            if cached is not None:
+                return cached
+        result = await Runner.run(agent, prompt, hooks=self.llm_hooks)
+        if self.run_cache:
+            self.run_cache.store(agent, prompt, result)
+        return result
+
+    async def _investigate_one_repo(self, repo: GitHubRepo, commit_count: int | None = None) -> tuple:
+        """Helper to run the three analyses in parallel for one repo."""
         repo_name = repo.name
         
         # CORRECTED: The ReadmeAgent now gets the direct URL found by the SearchAgent.
         # If no README was found, we pass a message indicating that.
         readme_prompt = repo.readme_url if repo.readme_url else "No README file found for this repository."
-        
+        readme_task = self._run_agent(self.readme_analyzer, readme_prompt)
+
+        if self.deterministic_analysis:
+            # Fast path: no model call is needed to turn API data into these objects.
+            readme_run, activity, structure = await asyncio.gather(
+                readme_task,
+                compute_activity_analysis(repo_name, commit_count),
+                compute_structure_analysis(repo_name),
+            )
+            if self.llm_comments and activity and structure:
+                activity, structure = await self._write_comments(repo_name, activity, structure)
+            return repo, readme_run.final_output, activity, structure
+
         activity_prompt = f"repo_full_name: {repo_name}"
         structure_prompt = f"repo_full_name: {repo_name}"
         
-        readme_task = Runner.run(self.readme_analyzer, readme_prompt)
-        activity_task = Runner.run(self.activity_analyzer, activity_prompt)
-        structure_task = Runner.run(self.structure_analyzer, structure_prompt)
+        activity_task = self._run_agent(self.activity_analyzer, activity_prompt)
+        structure_task = self._run_agent(self.structure_analyzer, structure_prompt)
         
         results = await asyncio.gather(readme_task, activity_task, structure_task)
         return repo, results[0].final_output, results[1].final_output, results[2].final_output
+
+    async def _write_comments(self, repo_name: str, activity: ActivityAnalysis, structure: StructureAnalysis) -> tuple:
+        """Asks the comment agent to replace the rule-based comments with LLM-written ones."""
+        prompt = (
+            f"Repository: {repo_name}\n"
+            f"Activity: {activity.activity_level}, {activity.recent_commit_count} commits in 14 days.\n"
+            f"Structure: maturity {structure.maturity_score}/10. {structure.comment}"
+        )
+        comments_run = await self._run_agent(self.commenter, prompt)
+        comments = comments_run.final_output
+        if isinstance(comments, AnalysisComments):
+            activity = activity.model_copy(update={"comment": comments.activity_comment})
+            structure = structure.model_copy(update={"comment": comments.structure_comment})
+        return activity, structure
     
     async def run(self, topic: str):
+        try:
+            await self._run_workflow(topic)
+        finally:
+            # Release the pooled keep-alive connections used by the GitHub tools.
+            await aclose_http_client()
+            if self.response_cache:
+                self.console.print(f"[grey50]GitHub response cache: {self.response_cache.summary()}[/grey50]")
+            if self.run_cache:
+                self.console.print(f"[grey50]Agent run cache: {self.run_cache.summary()}[/grey50]")
+
+    async def _run_workflow(self, topic: str):
         self.console.rule("[bold blue]GitHub Trend Scout Initialized[/bold blue]")
         
         # Step 1: Search
         self.console.print(f"\n[bold green]Step 1: Searching for trending repositories on '{topic}'...[/bold green]")
-        search_run = await Runner.run(self.searcher, topic)
+        search_prompt = f"topic: {topic}\nmax_results: {self.max_repos}"
+        search_run = await self._run_agent(self.searcher, search_prompt)
         search_result = search_run.final_output
 
         if not isinstance(search_result, GitHubSearchResult) or not search_result.repositories:
@@ -52,8 +163,17 @@ class GitHubTrendManager:
 
         # Step 2: Investigate in Parallel
         self.console.print("\n[bold green]Step 2: Forking to investigate repositories in parallel...[/bold green]")
-        investigation_tasks = [self._investigate_one_repo(repo) for repo in search_result.repositories]
-        investigation_results = await asyncio.gather(*investigation_tasks)
+        commit_counts = {}
+        if self.deterministic_analysis:
+            # One GraphQL request covers the commit activity of up to 50 repos.
+            commit_counts = await fetch_commit_activity_batch([repo.name for repo in search_result.repositories])
+        # The scheduler keeps at most `max_concurrency` repos in flight; the most
+        # starred repositories are investigated first.
+        investigation_jobs = [
+            (repo.stargazers_count, lambda repo=repo: self._investigate_one_repo(repo, commit_counts.get(repo.name)))
+            for repo in search_result.repositories
+        ]
+        investigation_results = await self.scheduler.run(investigation_jobs)
         self.console.print("Investigation complete. Joining results.")
 
         # Step 3: Format data for the final report
@@ -82,7 +202,7 @@ class GitHubTrendManager:
 
         # Step 4: Write & Save
         self.console.print("\n[bold green]Step 3: Writing final intelligence report...[/bold green]")
-        report_run = await Runner.run(self.reporter, report_prompt)
+        report_run = await self._run_agent(self.reporter, report_prompt)
         confirmation_message = str(report_run.final_output)
 
         self.console.rule("[bold magenta]Workflow Complete[/bold magenta]")
@@ -0,0 +1,200 @@
+# mock_github.py
+"""
+A local, deterministic mock of the parts of the GitHub API the scout uses.
+
+It serves the REST search, readme, contents, commits (with a `Link` header
+for pagination) and git trees endpoints, plus the aliased GraphQL commit
+history query, from a real HTTP server on 127.0.0.1. The tools talk to it
+through their normal pooled client, so connection handling, streaming and
+pagination are exercised exactly as against GitHub. Point the tools at it by
+setting `GITHUB_API_URL` to `MockGitHubAPI.base_url` before importing them.
+
+Every repository's data (stars, commit count, tree size) is derived from its
+index, so runs are repeatable. `latency` adds a simulated server delay per
+request, as a constant or a (low, high) range in seconds.
+"""
+import base64
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REPO_PATH = re.compile(r"^/repos/(?P<owner>[^/]+)/(?P<name>[^/]+)(?P<rest>/.*)?$")
+GRAPHQL_REPO = re.compile(r'(r\d+): repository\(owner: "([^"]+)", name: "([^"]+)"\)')
+
+
+class MockGitHubAPI:
+    """
+    Serves a fake GitHub API in a background thread.
+
+    Args:
+        max_repos: How many repositories exist for any search query.
+        latency: Simulated server time per request (seconds, or a (low, high) range).
+        seed: Seeds the latency jitter.
+        owner: The organisation that owns every mock repository.
+    """
+    def __init__(self, max_repos: int = 1000, latency: float | tuple = 0.0, seed: int = 0, owner: str = "bench-org"):
+        self.max_repos = max_repos
+        self.latency = latency
+        self.owner = owner
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.request_counts: dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    # --- Deterministic Data ---
+    @staticmethod
+    def repo_index(name: str) -> int:
+        match = re.search(r"(\d+)$", name)
+        return int(match.group(1)) if match else 0
+
+    def commit_count(self, index: int) -> int:
+        # Spread repos across every activity level, including a few busy ones that need several pages.
+        return (index * 37) % 120 if index % 10 else 260 + index % 50
+
+    def tree_entries(self, index: int) -> list:
+        files = 20 + (index * 53) % 400
+        entries = [{"path": "src", "type": "tree", "sha": f"tree-src-{index}"}]
+        if index % 3:
+            entries.append({"path": "tests", "type": "tree", "sha": f"tree-tests-{index}"})
+            entries += [{"path": f"tests/test_module_{i}.py", "type": "blob", "sha": f"t{i}"} for i in range(files // 10)]
+        entries += [{"path": f"src/module_{i}.py", "type": "blob", "sha": f"s{i}"} for i in range(files)]
+        entries += [{"path": "README.md", "type": "blob", "sha": "r"}, {"path": "pyproject.toml", "type": "blob", "sha": "p"}]
+        return entries
+
+    def repo_item(self, index: int) -> dict:
+        full_name = f"{self.owner}/repo-{index}"
+        return {
+            "full_name": full_name,
+            "html_url": f"https://github.com/{full_name}",
+            "description": f"Mock repository number {index} for benchmarks.",
+            "stargazers_count": 10_000 - index,
+            "language": ("Python", "TypeScript", "Rust", "Go")[index % 4],
+        }
+
+    # --- Server ---
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("The mock GitHub API is not running; call start() first.")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockGitHubAPI":
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real API
+            def do_GET(self):
+                api._handle(self, "GET")
+            def do_POST(self):
+                api._handle(self, "POST")
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockGitHubAPI":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # --- Routing ---
+    def _count(self, endpoint: str) -> None:
+        with self._counts_lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+    def _delay(self) -> None:
+        if isinstance(self.latency, tuple):
+            with self._rng_lock:
+                delay = self._rng.uniform(*self.latency)
+        else:
+            delay = self.latency
+        if delay:
+            time.sleep(delay)
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        self._delay()
+        url = urlparse(handler.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if method == "POST" and url.path == "/graphql":
+            length = int(handler.headers.get("Content-Length", 0))
+            self._count("graphql")
+            return self._send(handler, 200, self._graphql(json.loads(handler.rfile.read(length) or b"{}")))
+        if url.path == "/search/repositories":
+            self._count("search")
+            return self._send(handler, 200, self._search(query))
+        match = REPO_PATH.match(url.path)
+        if match:
+            index = self.repo_index(match.group("name"))
+            rest = match.group("rest") or ""
+            full_name = f"{match.group('owner')}/{match.group('name')}"
+            if rest == "/readme":
+                self._count("readme")
+                return self._send(handler, 200, {"url": f"{self.base_url}/repos/{full_name}/contents/README.md"})
+            if rest == "/contents/README.md":
+                self._count("contents")
+                text = f"# {full_name}\n\nInstall with pip. Usage examples follow.\n" + "Details. " * (50 + index % 200)
+                return self._send(handler, 200, {"content": base64.b64encode(text.encode()).decode(), "encoding": "base64"})
+            if rest == "/commits":
+                self._count("commits")
+                return self._commits(handler, full_name, index, query)
+            if rest.startswith("/git/trees/"):
+                self._count("trees")
+                return self._send(handler, 200, {"sha": "HEAD", "tree": self.tree_entries(index), "truncated": False})
+        self._count("not_found")
+        self._send(handler, 404, {"message": "Not Found"})
+
+    def _send(self, handler: BaseHTTPRequestHandler, status: int, body, headers: dict | None = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json; charset=utf-8")
+        handler.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    # --- Endpoints ---
+    def _search(self, query: dict) -> dict:
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        start = (page - 1) * per_page
+        indices = range(start, min(start + per_page, self.max_repos))
+        return {"total_count": self.max_repos, "items": [self.repo_item(i) for i in indices]}
+
+    def _commits(self, handler: BaseHTTPRequestHandler, full_name: str, index: int, query: dict) -> None:
+        total = self.commit_count(index)
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        last_page = max(1, -(-total // per_page))
+        start = (page - 1) * per_page
+        commits = [{"sha": f"{index}-{i}"} for i in range(start, min(start + per_page, total))]
+        headers = {}
+        if last_page > 1:
+            base = f"{self.base_url}/repos/{full_name}/commits?per_page={per_page}"
+            headers["Link"] = f'<{base}&page={min(page + 1, last_page)}>; rel="next", <{base}&page={last_page}>; rel="last"'
+        self._send(handler, 200, commits, headers)
+
+    def _graphql(self, body: dict) -> dict:
+        data = {}
+        for alias, owner, name in GRAPHQL_REPO.findall(body.get("query", "")):
+            count = self.commit_count(self.repo_index(name))
+            data[alias] = {"defaultBranchRef": {"target": {"history": {"totalCount": count}}}}
+        return {"data": data}
@@ -0,0 +1,109 @@
+# scheduler.py
+"""
+A small bounded-concurrency scheduler for the trend scout.
+
+Running one `asyncio.gather` over every repository means N repos fan out into
+3N simultaneous LLM calls plus all the GitHub calls those agents trigger.
+This module provides:
+- TokenBucket: a rate limiter, used separately for the LLM and the GitHub API.
+- TaskScheduler: a fixed pool of workers that pulls jobs from a priority queue,
+  so at most `max_concurrency` jobs are in flight and important jobs go first.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from typing import Any, Awaitable, Callable, List, Tuple
+
+
+class TokenBucket:
+    """
+    A classic token bucket: `rate` tokens are added per second, up to `capacity`.
+    Each call takes one token, waiting if the bucket is empty.
+    It is thread-safe, so synchronous tool code can share it with async code.
+    """
+    def __init__(self, rate: float, capacity: int | None = None):
+        if rate <= 0:
+            raise ValueError("TokenBucket rate must be positive.")
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Takes `tokens` from the bucket and returns how long the caller must wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= tokens
+            # A negative balance is a debt the caller pays off by sleeping.
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, tokens: float = 1) -> None:
+        """Waits (without blocking the event loop) until `tokens` are available."""
+        delay = self._reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self, tokens: float = 1) -> None:
+        """The synchronous version of `acquire`, for use inside blocking tools."""
+        delay = self._reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+
+class TaskScheduler:
+    """
+    Runs async jobs on a fixed pool of workers.
+    Jobs with a higher `priority` are started first; jobs with equal priority
+    run in submission order.
+    """
+    def __init__(self, max_concurrency: int = 4):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        self.max_concurrency = max_concurrency
+        self._counter = itertools.count()
+
+    async def _worker(self, queue: asyncio.PriorityQueue):
+        while True:
+            _, _, job, future = await queue.get()
+            try:
+                if not future.cancelled():
+                    future.set_result(await job())
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                queue.task_done()
+
+    async def run(
+        self,
+        jobs: List[Tuple[int, Callable[[], Awaitable[Any]]]],
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Executes `(priority, job_factory)` pairs and returns their results in
+        the order the jobs were given, like `asyncio.gather`.
+        Each factory is only called when a worker is free, so no coroutine is
+        created (and no memory is held) for jobs still waiting in the queue.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        futures = []
+        for priority, job in jobs:
+            future = loop.create_future()
+            futures.append(future)
+            queue.put_nowait((-priority, next(self._counter), job, future))
+
+        workers = [
+            asyncio.create_task(self._worker(queue))
+            for _ in range(min(self.max_concurrency, len(futures)))
+        ]
+        try:
+            return await asyncio.gather(*futures, return_exceptions=return_exceptions)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
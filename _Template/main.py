@@ -1,25 +1,78 @@
 # main.py
+import argparse
 import asyncio
+import json
 import os
+import time
+from typing import Iterable, Iterator
 from dotenv import load_dotenv
 from rich.console import Console
 
-from agents import Runner, trace
+from agents import trace
+from system.run_cache import CACHE_PATH, RunCache
+from system.fake_model import FakeModel
+from system.registry import discover_projects, load_project
+from system.semantic_router import SemanticRouter
 
-# --- Import the AGENTS registry from the chosen project's config ---
-# To switch projects, you only need to change this one line.
-from projects.my_first_project.config import AGENTS
+# The project whose AGENTS registry is used. Override it with `--project`.
+DEFAULT_PROJECT = "my_first_project"
 
 # ------------------------------------------------------------------
 # THE WORKFLOW MANAGER
 # ------------------------------------------------------------------
 class WorkflowManager:
-    def __init__(self):
+    def __init__(self, project: str = DEFAULT_PROJECT, model=None, learn_routes: bool = True):
         self.console = Console()
-        # The entry point is now retrieved from the standard AGENTS dictionary.
-        self.entry_agent = AGENTS.get("triage")
-        if not self.entry_agent:
-            raise ValueError("Configuration error: AGENTS dictionary must have a 'triage' key.")
+        # Agents are built lazily: only the ones a query touches are constructed.
+        self.agents = load_project(project)
+        # An optional model (e.g. a FakeModel) that replaces every agent's own.
+        self.agents.model_override = model
+        if "triage" not in self.agents:
+            raise ValueError("Configuration error: the AGENTS registry must have a 'triage' key.")
+        # Repeated queries are answered from the cache instead of the model.
+        # Weather is live data, so its answers (even via a triage handoff) are never cached.
+        # A model override's answers are kept in memory only: the on-disk cache is keyed by
+        # the agents' own models, so they would be served later as real answers (and vice versa).
+        self.run_cache = RunCache(db_path=None if model else CACHE_PATH, exclude=["WeatherAgent"])
+        # Near-repeats of familiar queries are sent straight to the right specialist
+        # by a local similarity router; everything else goes through the triage LLM.
+        self.router = SemanticRouter().load()
+        # Off for runs whose answers must not teach the shared router (e.g. a fake model's).
+        self.learn_routes = learn_routes
+
+    @property
+    def entry_agent(self):
+        return self.agents["triage"]
+
+    def select_agent(self, user_query: str):
+        """
+        Picks the agent that should handle a query: a specialist directly if
+        the semantic router is confident, otherwise the triage agent.
+        """
+        decision = self.router.route(user_query)
+        if decision and decision.label in self.agents:
+            self.console.print(f"[grey50](Routed locally to '{decision.label}', similarity {decision.score:.2f})[/grey50]")
+            return self.agents[decision.label]
+        return self.entry_agent
+
+    def learn_route(self, user_query: str, agent, result, save_router: bool = True):
+        """Teaches the router which specialist the triage agent handed off to."""
+        # Compare keys rather than `self.entry_agent`, which would build the triage agent.
+        if not self.learn_routes or self.agents.key_for(agent) != "triage":
+            return
+        specialist = self.agents.key_for(result.last_agent)
+        if specialist and specialist != "triage":
+            self.router.add(user_query, specialist)
+            if save_router:
+                self.router.save()
+
+    async def handle(self, user_query: str, save_router: bool = True):
+        """Routes one query to the right agent and returns its run result."""
+        agent = self.select_agent(user_query)
+        # We run the chosen agent through the cache.
+        result = await self.run_cache.run(agent, user_query)
+        self.learn_route(user_query, agent, result, save_router)
+        return result
 
     async def run(self, user_query: str):
         """The main orchestration method."""
@@ -27,29 +80,123 @@ class WorkflowManager:
 
         try:
             with trace("HandoffWorkflow"):
-                # We run the entry agent defined in the config.
-                result = await Runner.run(
-                    agent=self.entry_agent,
-                    user_input=user_query,
-                )
+                result = await self.handle(user_query)
                 self.console.print("\n[bold green]✅ Workflow Complete![/bold green]")
                 self.console.print(f"[grey50](Handled by: {result.last_agent.name})[/grey50]")
                 self.console.print("[bold yellow]📤 Final Output:[/bold yellow]")
                 self.console.print(result.final_output)
+                self.console.print(f"[grey50](Agent startup: {self.agents.timings()})[/grey50]")
         except Exception as e:
             self.console.print(f"\n[bold red]🔥 An unexpected error occurred:[/bold red] {e}")
 
+    @staticmethod
+    def _read_queries(source: str | Iterable[str]) -> Iterator[str]:
+        """
+        Yields queries from an iterable of strings, or the non-empty lines of
+        a JSONL file (parsed later by `_parse_query`, so one bad line only
+        fails its own query). The file is read lazily, so huge backlogs are
+        never loaded at once.
+        """
+        if not isinstance(source, str):
+            yield from source
+            return
+        with open(source, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+    @staticmethod
+    def _parse_query(line: str) -> str:
+        """A JSONL line is either a JSON string or an object with a "query" field."""
+        record = json.loads(line)
+        if isinstance(record, dict):
+            if "query" not in record:
+                raise ValueError('JSON object has no "query" field.')
+            return str(record["query"])
+        return str(record)
+
+    async def run_batch(self, queries: str | Iterable[str], output_path: str, concurrency: int = 4) -> dict:
+        """
+        Runs many queries with at most `concurrency` in flight. Each result is
+        appended to `output_path` (JSONL) as soon as it finishes, so lines are
+        in completion order and carry the query's original `index`. A query
+        that fails (including a malformed input line) gets an "error" record.
+        Returns throughput statistics.
+        """
+        self.console.print(f"\n[bold blue]🚀 Running batch with concurrency {concurrency}...[/bold blue]")
+        from_file = isinstance(queries, str)
+        pending = enumerate(self._read_queries(queries))
+        stats = {"completed": 0, "failed": 0}
+        started = time.perf_counter()
+
+        async def worker(out):
+            # Workers share one iterator, so queries are pulled only when a slot frees up.
+            for index, entry in pending:
+                query_started = time.perf_counter()
+                record = {"index": index}
+                try:
+                    user_query = self._parse_query(entry) if from_file else entry
+                    record["query"] = user_query
+                    result = await self.handle(user_query, save_router=False)
+                    output = result.final_output
+                    record.update(
+                        output=output.model_dump(mode="json") if hasattr(output, "model_dump") else str(output),
+                        agent=result.last_agent.name,
+                    )
+                    stats["completed"] += 1
+                except Exception as e:
+                    record["error"] = f"{type(e).__name__}: {e}"
+                    stats["failed"] += 1
+                record["seconds"] = round(time.perf_counter() - query_started, 3)
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+        with trace("BatchWorkflow"), open(output_path, "w", encoding="utf-8") as out:
+            # Every worker finishes before the file is closed, even if one of them fails
+            # (e.g. the input file cannot be read).
+            outcomes = await asyncio.gather(*(worker(out) for _ in range(max(1, concurrency))), return_exceptions=True)
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        if errors:
+            raise errors[0]
+        if self.learn_routes:
+            self.router.save()
+
+        elapsed = time.perf_counter() - started
+        total = stats["completed"] + stats["failed"]
+        stats.update(total=total, seconds=round(elapsed, 2), queries_per_second=round(total / elapsed, 2) if elapsed else 0.0)
+        self.console.print(
+            f"\n[bold green]✅ Batch complete:[/bold green] {total} queries "
+            f"({stats['failed']} failed) in {stats['seconds']}s, "
+            f"{stats['queries_per_second']} queries/s. Results: {output_path}"
+        )
+        return stats
+
 
 # ------------------------------------------------------------------
 # THE MAIN ENTRYPOINT
 # ------------------------------------------------------------------
 async def main() -> None:
     load_dotenv()
-    if not os.getenv("OPENAI_API_KEY"):
-        print("❌ ERROR: OPENAI_API_KEY environment variable not set.")
+    parser = argparse.ArgumentParser(description="Run the agent workflow.")
+    parser.add_argument("--project", default=DEFAULT_PROJECT, choices=discover_projects(), help="Which project's agents to use.")
+    parser.add_argument("--batch", help="JSONL file of queries to run non-interactively.")
+    parser.add_argument("--out", default="results.jsonl", help="Where to write batch results (JSONL).")
+    parser.add_argument("--concurrency", type=int, default=4, help="How many batch queries run at once.")
+    parser.add_argument("--offline", action="store_true", help="Use a local fake model instead of the OpenAI API.")
+    args = parser.parse_args()
+    if not args.offline and not os.getenv("OPENAI_API_KEY"):
+        print("❌ ERROR: OPENAI_API_KEY environment variable not set (or pass --offline).")
+        return
+
+    if args.offline:
+        # The fake model's handoffs are made up, so they must not be learned as routes.
+        manager = WorkflowManager(args.project, FakeModel(latency=(0.2, 0.8)), learn_routes=False)
+    else:
+        manager = WorkflowManager(args.project)
+    if args.batch:
+        await manager.run_batch(args.batch, args.out, args.concurrency)
         return
 
-    manager = WorkflowManager()
     user_query = Console().input("[bold yellow]Ask your agent: [/bold yellow]").strip()
     if user_query:
         await manager.run(user_query)
@@ -2,52 +2,56 @@
 """
 This is the "control panel" for your project. It defines your team of
 specialist agents and the main TriageAgent that orchestrates them.
-It exports a single AGENTS dictionary that the main application can use.
+It exports a single AGENTS registry that the main application can use.
+
+Agents are registered as factories and only built the first time they are
+used, so put tool imports inside the factory that needs them: a query that
+never reaches the WeatherAgent never pays for importing its tools.
 """
 from agents import Agent, handoff
 from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
-from tools.local_tools import get_weather
+from system.registry import AgentRegistry
+
+# This is the single, consistent entry point for the main application.
+# The 'triage' key should point to the primary agent that starts the workflow.
+AGENTS = AgentRegistry()
 
 # --- 1. DEFINE SPECIALIST AGENTS ---
-math_agent = Agent(
-    name="MathAgent",
-    handoff_description="An expert in mathematics for calculations and concepts.",
-    instructions="You are a math genius. Answer the user's question clearly.",
-    model="gpt-4-turbo",
-)
+@AGENTS.register("math")
+def math_agent(registry: AgentRegistry) -> Agent:
+    return Agent(
+        name="MathAgent",
+        handoff_description="An expert in mathematics for calculations and concepts.",
+        instructions="You are a math genius. Answer the user's question clearly.",
+        model="gpt-4-turbo",
+    )
 
-weather_agent = Agent(
-    name="WeatherAgent",
-    handoff_description="Can provide up-to-date weather forecasts for any city.",
-    instructions="You are a weather specialist. Use the get_weather tool.",
-    tools=[get_weather],
-    model="gpt-4o-mini",
-)
+@AGENTS.register("weather")
+def weather_agent(registry: AgentRegistry) -> Agent:
+    from tools.local_tools import get_weather
+    return Agent(
+        name="WeatherAgent",
+        handoff_description="Can provide up-to-date weather forecasts for any city.",
+        instructions="You are a weather specialist. Use the get_weather tool.",
+        tools=[get_weather],
+        model="gpt-4o-mini",
+    )
 
 # <-- TODO: Add your other specialist agents here.
 
 # --- 2. DEFINE THE TRIAGE (ORCHESTRATOR) AGENT ---
-triage_agent = Agent(
-    name="TriageAgent",
-    instructions=f"""{RECOMMENDED_PROMPT_PREFIX}
-    You are a master triage agent. Analyze the user's request and delegate
-    it to the most appropriate specialist from your team. Do not answer yourself.
-    """,
-    handoffs=[
-        handoff(math_agent),
-        handoff(weather_agent),
-        # <-- TODO: Add other specialists to the handoff list.
-    ],
-    model="gpt-4o-mini",
-)
-
-# --- 3. EXPORT THE AGENT REGISTRY ---
-# This is the single, consistent entry point for the main application.
-# The 'triage' key should point to the primary agent that starts the workflow.
-AGENTS = {
-    "triage": triage_agent,
-    # You can also add other agents here if the orchestrator needs to
-    # access them by name for more complex workflows.
-    "math": math_agent,
-    "weather": weather_agent,
-}
\ No newline at end of file
+@AGENTS.register("triage")
+def triage_agent(registry: AgentRegistry) -> Agent:
+    return Agent(
+        name="TriageAgent",
+        instructions=f"""{RECOMMENDED_PROMPT_PREFIX}
+        You are a master triage agent. Analyze the user's request and delegate
+        it to the most appropriate specialist from your team. Do not answer yourself.
+        """,
+        handoffs=[
+            handoff(registry["math"]),
+            handoff(registry["weather"]),
+            # <-- TODO: Add other specialists to the handoff list.
+        ],
+        model="gpt-4o-mini",
+    )
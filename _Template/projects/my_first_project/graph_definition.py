@@ -4,25 +4,47 @@ This file defines the actual workflow for your project by creating
 node actions and connecting them into a graph.
 """
 from system.graph import GraphNode, WorkflowState
-from agents import Runner, Agent
+from system.metrics import run_agent
+from system.semantic_router import SemanticRouter
+from agents import Agent
 
 # --- NODE ACTIONS ---
 # These functions are now "factories" that take the agent registry
 # and return the actual async action function. This pattern cleanly
 # gives the actions access to the agents they need without globals.
+# Agents are run with `run_agent` so their tokens and tool calls are
+# recorded in the node's metrics (`state.metrics`).
 
-def create_triage_action(agents: dict[str, Agent]):
+# The triage labels and the node each one leads to.
+TRIAGE_ROUTES = {
+    "WEATHER": "GetWeather",
+    "MATH": "DoMath",
+    "GENERAL": "GeneralResponse"
+}
+
+def create_triage_action(agents: dict[str, Agent], router: SemanticRouter | None = None):
     async def triage_action(state: WorkflowState) -> WorkflowState:
-        """Uses the TriageAgent to classify the user's intent."""
-        result = await Runner.run(agents["TriageAgent"], state.initial_input)
+        """
+        Classifies the user's intent. A confident match from the semantic
+        router skips the LLM; otherwise the TriageAgent decides and the router
+        learns its answer for next time. Only labels in TRIAGE_ROUTES are
+        used or learned, so a malformed LLM answer is never routed to directly.
+        """
+        decision = router.route(state.initial_input) if router is not None else None
+        if decision and decision.label in TRIAGE_ROUTES:
+            state.next_node = decision.label
+            return state
+        result = await run_agent(agents["TriageAgent"], state.initial_input)
         state.next_node = result.final_output.strip().upper()
+        if router is not None and state.next_node in TRIAGE_ROUTES:
+            router.add(state.initial_input, state.next_node)
         return state
     return triage_action
 
 def create_weather_action(agents: dict[str, Agent]):
     async def weather_action(state: WorkflowState) -> WorkflowState:
         """This node is activated for weather-related queries."""
-        result = await Runner.run(agents["WeatherAgent"], state.initial_input)
+        result = await run_agent(agents["WeatherAgent"], state.initial_input)
         state.final_answer = result.final_output
         return state
     return weather_action
@@ -30,7 +52,7 @@ def create_weather_action(agents: dict[str, Agent]):
 def create_math_action(agents: dict[str, Agent]):
     async def math_action(state: WorkflowState) -> WorkflowState:
         """This node is activated for math-related queries."""
-        result = await Runner.run(agents["MathAgent"], state.initial_input)
+        result = await run_agent(agents["MathAgent"], state.initial_input)
         state.final_answer = result.final_output
         return state
     return math_action
@@ -46,12 +68,15 @@ def create_general_action(agents: dict[str, Agent]):
 
 # --- GRAPH ASSEMBLY ---
 # This function now ACCEPTS the agents registry and wires everything up.
-def define_graph(graph_runner, agents: dict[str, Agent]):
-    """Assembles the complete workflow graph using the provided agents."""
+def define_graph(graph_runner, agents: dict[str, Agent], router: SemanticRouter | None = None):
+    """
+    Assembles the complete workflow graph using the provided agents.
+    Pass a `SemanticRouter` to let the triage node skip the LLM for familiar queries.
+    """
     
     # 1. Create all nodes by calling the action factories
     nodes = [
-        GraphNode(name="Triage", action=create_triage_action(agents)),
+        GraphNode(name="Triage", action=create_triage_action(agents, router)),
         GraphNode(name="GetWeather", action=create_weather_action(agents)),
         GraphNode(name="DoMath", action=create_math_action(agents)),
         GraphNode(name="GeneralResponse", action=create_general_action(agents)),
@@ -63,9 +88,5 @@ def define_graph(graph_runner, agents: dict[str, Agent]):
     graph_runner.set_entry_point("Triage")
     graph_runner.add_conditional_edge(
         start_node="Triage",
-        path_map={
-            "WEATHER": "GetWeather",
-            "MATH": "DoMath",
-            "GENERAL": "GeneralResponse"
-        }
+        path_map=TRIAGE_ROUTES,
     )
\ No newline at end of file
@@ -0,0 +1,224 @@
+# server.py
+"""
+A long-running HTTP service for the workflow (requires `aiohttp`).
+
+Running `main.py` once per query pays for interpreter start-up, `load_dotenv`,
+importing `agents` and building the agent registry every single time. This
+server does all of that once and keeps the agents, the run cache, the semantic
+router and the model client connections warm across requests. Routes the
+router learns are saved to disk every minute and on shutdown.
+
+Endpoints:
+    GET  /health  -> {"status": "ok", "in_flight": n, "waiting": n}
+    POST /run     {"query": "..."} -> {"output": ..., "agent": "..."}
+    POST /stream  {"query": "..."} -> Server-Sent Events: `agent`, `delta`
+                  (partial text as it is generated) and a final `done` event.
+
+Backpressure: at most `--max-concurrent` runs execute at once and at most
+`--max-waiting` more may queue; beyond that the server answers 503 with a
+Retry-After header instead of piling up work. Streamed chunks are awaited as
+they are written, so a slow client slows its own run, not the server.
+
+Usage: python server.py --port 8080 (add --offline to serve a local fake model)
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from aiohttp import web
+from dotenv import load_dotenv
+from openai.types.responses import ResponseTextDeltaEvent
+
+from agents import Runner
+from main import DEFAULT_PROJECT, WorkflowManager
+from system.fake_model import FakeModel
+from system.registry import discover_projects
+
+
+class AdmissionControl:
+    """Limits running requests and rejects new ones once the waiting line is full."""
+    def __init__(self, max_concurrent: int, max_waiting: int):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+
+    def try_enter(self) -> bool:
+        """Reserves a place (running or waiting), or returns False if the server is saturated."""
+        if self.in_flight + self.waiting >= self.max_concurrent + self.max_waiting:
+            return False
+        self.waiting += 1
+        return True
+
+    async def __aenter__(self):
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+def _busy_response() -> web.Response:
+    return web.json_response(
+        {"error": "Server is at capacity, please retry shortly."}, status=503, headers={"Retry-After": "1"}
+    )
+
+
+async def _read_query(request: web.Request) -> str:
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise web.HTTPBadRequest(text="Request body must be JSON.")
+    query = str(body.get("query", "")).strip() if isinstance(body, dict) else ""
+    if not query:
+        raise web.HTTPBadRequest(text='Request body must contain a non-empty "query".')
+    return query
+
+
+def _jsonable(output):
+    return output.model_dump(mode="json") if hasattr(output, "model_dump") else str(output)
+
+
+async def health(request: web.Request) -> web.Response:
+    admission: AdmissionControl = request.app["admission"]
+    return web.json_response({"status": "ok", "in_flight": admission.in_flight, "waiting": admission.waiting})
+
+
+async def run_query(request: web.Request) -> web.Response:
+    """Runs one query and returns the final output as JSON."""
+    manager: WorkflowManager = request.app["manager"]
+    admission: AdmissionControl = request.app["admission"]
+    query = await _read_query(request)
+    if not admission.try_enter():
+        return _busy_response()
+    async with admission:
+        try:
+            # The router is saved by `_save_router_periodically`, not on every request.
+            result = await manager.handle(query, save_router=False)
+        except Exception as e:
+            return web.json_response({"error": f"{type(e).__name__}: {e}"}, status=500)
+    return web.json_response({"output": _jsonable(result.final_output), "agent": result.last_agent.name})
+
+
+async def stream_query(request: web.Request) -> web.StreamResponse:
+    """Runs one query and streams partial output as Server-Sent Events."""
+    manager: WorkflowManager = request.app["manager"]
+    admission: AdmissionControl = request.app["admission"]
+    query = await _read_query(request)
+    if not admission.try_enter():
+        return _busy_response()
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+
+    async def send(event: str, data) -> None:
+        # `write` waits for the socket buffer to drain, which is what applies backpressure.
+        await response.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+
+    # Everything after `try_enter` happens inside the block, so the reserved place is
+    # released even if the client disconnects (and the handler is cancelled) early.
+    async with admission:
+        await response.prepare(request)
+        try:
+            agent = manager.select_agent(query)
+            # Like /run, repeated queries are answered from the run cache.
+            result = manager.run_cache.lookup(agent, query)
+            if result is None:
+                result = Runner.run_streamed(agent, query)
+                async for event in result.stream_events():
+                    if event.type == "agent_updated_stream_event":
+                        await send("agent", {"agent": event.new_agent.name})
+                    elif event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                        await send("delta", {"text": event.data.delta})
+                manager.run_cache.store(agent, query, result)
+            else:
+                await send("agent", {"agent": result.last_agent.name})
+            manager.learn_route(query, agent, result, save_router=False)
+            await send("done", {"output": _jsonable(result.final_output), "agent": result.last_agent.name})
+        except ConnectionResetError:
+            pass # The client went away; nothing left to send.
+        except Exception as e:
+            await send("error", {"error": f"{type(e).__name__}: {e}"})
+        await response.write_eof()
+    return response
+
+
+async def _save_router_periodically(app: web.Application):
+    """
+    Saves the routes learned from requests every `router_save_interval`
+    seconds and on shutdown, instead of writing the file on the event loop
+    after every request.
+    """
+    manager: WorkflowManager = app["manager"]
+    saved_size = len(manager.router.labels)
+
+    def save_if_changed() -> None:
+        nonlocal saved_size
+        if len(manager.router.labels) != saved_size:
+            manager.router.save()
+            saved_size = len(manager.router.labels)
+
+    async def loop() -> None:
+        while True:
+            await asyncio.sleep(app["router_save_interval"])
+            save_if_changed()
+
+    task = asyncio.create_task(loop())
+    yield
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    save_if_changed()
+
+
+def create_app(
+    max_concurrent: int = 8, max_waiting: int = 32, project: str = DEFAULT_PROJECT, router_save_interval: float = 60.0,
+    offline: bool = False,
+) -> web.Application:
+    """
+    Builds the application with one warm WorkflowManager shared by all requests.
+    With `offline`, every agent answers with a local fake model, as in `main.py --offline`.
+    """
+    app = web.Application()
+    if offline:
+        # The fake model's handoffs are made up, so they must not be learned as routes.
+        app["manager"] = WorkflowManager(project, FakeModel(latency=(0.2, 0.8)), learn_routes=False)
+    else:
+        app["manager"] = WorkflowManager(project)
+    app["admission"] = AdmissionControl(max_concurrent, max_waiting)
+    app["router_save_interval"] = router_save_interval
+    app.cleanup_ctx.append(_save_router_periodically)
+    app.add_routes([
+        web.get("/health", health),
+        web.post("/run", run_query),
+        web.post("/stream", stream_query),
+    ])
+    return app
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Serve the agent workflow over HTTP.")
+    parser.add_argument("--project", default=DEFAULT_PROJECT, choices=discover_projects(), help="Which project's agents to serve.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrent", type=int, default=8, help="Runs executing at the same time.")
+    parser.add_argument("--max-waiting", type=int, default=32, help="Requests allowed to queue before 503s.")
+    parser.add_argument("--router-save-interval", type=float, default=60.0, help="Seconds between saves of learned routes.")
+    parser.add_argument("--offline", action="store_true", help="Use a local fake model instead of the OpenAI API.")
+    args = parser.parse_args()
+    if not args.offline and not os.getenv("OPENAI_API_KEY"):
+        print("❌ ERROR: OPENAI_API_KEY environment variable not set (or pass --offline).")
+        return
+
+    app = create_app(args.max_concurrent, args.max_waiting, args.project, args.router_save_interval, args.offline)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# system/checkpoint.py
+"""
+Pluggable checkpoint stores for the graph engine.
+
+After every node, the GraphRunner hands the current WorkflowState and the name
+of the next node to a store. If the process crashes, `GraphRunner.resume(run_id)`
+loads the last checkpoint and continues from there, so the LLM calls made by
+earlier nodes are not paid for twice.
+
+State values are saved as JSON. Values that JSON cannot represent (e.g. a raw
+RunResult) are stored as their string form, so keep anything you need after a
+resume as plain data or Pydantic models (which are dumped to dicts).
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+# Run ids that are used as file names as they are; see `FileCheckpointStore._path`.
+_SAFE_RUN_ID = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*")
+
+
+def _to_jsonable(value: Any) -> Any:
+    """Fallback encoder used by `json.dumps` for values it cannot serialize."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+class Checkpoint:
+    """
+    A saved point in a workflow run: the state and where to continue from.
+    If `fork_pending` is set, `next_node` already ran and the run continues
+    with the parallel branches that follow it.
+    """
+    def __init__(
+        self, run_id: str, step: int, next_node: str, state: Optional[Dict[str, Any]], saved_at: str,
+        state_json: Optional[str] = None, fork_pending: bool = False,
+    ):
+        self.run_id = run_id
+        self.step = step
+        self.next_node = next_node
+        self.fork_pending = fork_pending
+        self.saved_at = saved_at
+        # A new checkpoint only holds the state's JSON; it is decoded if someone reads `state`.
+        self._state = state
+        self._state_json = state_json
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        if self._state is None:
+            self._state = json.loads(self._state_json)
+        return self._state
+
+    def to_json(self) -> str:
+        if self._state_json is None:
+            self._state_json = json.dumps(self._state, default=_to_jsonable)
+        header = json.dumps(
+            {
+                "run_id": self.run_id,
+                "step": self.step,
+                "next_node": self.next_node,
+                "fork_pending": self.fork_pending,
+                "saved_at": self.saved_at,
+            }
+        )
+        # Splice in the already encoded state rather than encoding it again.
+        return f'{header[:-1]}, "state": {self._state_json}}}'
+
+    @classmethod
+    def from_json(cls, data: str) -> "Checkpoint":
+        return cls(**json.loads(data))
+
+
+class CheckpointStore(ABC):
+    """The interface every checkpoint backend implements."""
+
+    def make_checkpoint(
+        self, run_id: str, step: int, next_node: str, state: Dict[str, Any], fork_pending: bool = False,
+    ) -> Checkpoint:
+        # Encoding to JSON detaches the stored copy from the live state; it is encoded once, here.
+        state_json = json.dumps(dict(state), default=_to_jsonable)
+        return Checkpoint(
+            run_id, step, next_node, None, datetime.now(timezone.utc).isoformat(), state_json, fork_pending,
+        )
+
+    @abstractmethod
+    def save(self, checkpoint: Checkpoint) -> None:
+        """Persists a checkpoint, replacing any earlier one for the same run."""
+
+    @abstractmethod
+    def load(self, run_id: str) -> Optional[Checkpoint]:
+        """Returns the latest checkpoint for `run_id`, or None if there is none."""
+
+    @abstractmethod
+    def delete(self, run_id: str) -> None:
+        """Removes all checkpoints for `run_id`."""
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Stores checkpoints in a single SQLite database file (one row per run)."""
+    def __init__(self, db_path: str = "checkpoints.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    run_id TEXT PRIMARY KEY,
+                    step INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    saved_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, step, data, saved_at) VALUES (?, ?, ?, ?)",
+                (checkpoint.run_id, checkpoint.step, checkpoint.to_json(), checkpoint.saved_at),
+            )
+
+    def load(self, run_id: str) -> Optional[Checkpoint]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM checkpoints WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return Checkpoint.from_json(row[0]) if row else None
+
+    def delete(self, run_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Stores each run's latest checkpoint as a JSON file in a directory."""
+    def __init__(self, directory: str = "checkpoints"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, run_id: str) -> str:
+        # Run ids can come from callers (e.g. a request), so one like "../x" must not leave
+        # the directory: anything but a plain file name is stored under its hash instead.
+        if not _SAFE_RUN_ID.fullmatch(run_id):
+            run_id = hashlib.sha256(run_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{run_id}.json")
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        path = self._path(checkpoint.run_id)
+        tmp_path = f"{path}.tmp"
+        # Write to a temp file first so a crash mid-write never corrupts the last good checkpoint.
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(checkpoint.to_json())
+        os.replace(tmp_path, path)
+
+    def load(self, run_id: str) -> Optional[Checkpoint]:
+        path = self._path(run_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return Checkpoint.from_json(f.read())
+
+    def delete(self, run_id: str) -> None:
+        path = self._path(run_id)
+        if os.path.exists(path):
+            os.remove(path)
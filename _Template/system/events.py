@@ -0,0 +1,57 @@
+# system/events.py
+"""
+Live events from a running graph, for `GraphRunner.run_streamed()`.
+
+While a streamed run is in progress, a queue is installed in a context
+variable. The GraphRunner emits `node_start` / `node_end` events into it, and
+`system.metrics.run_agent` switches to the SDK's streaming runner and emits
+`token_delta` and `tool_call` events as the model produces them. Outside a
+streamed run `emit()` does nothing, so ordinary runs pay nothing for this.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+_event_queue: ContextVar[Optional[asyncio.Queue]] = ContextVar("graph_event_queue", default=None)
+
+
+class GraphEvent:
+    """
+    One event of a streamed run.
+
+    `type` is one of "node_start", "token_delta", "tool_call", "node_end",
+    "run_end" (whose `state` is the final WorkflowState) or "error".
+    """
+    def __init__(self, type: str, node: Optional[str] = None, data: Optional[Dict[str, Any]] = None, state: Any = None):
+        self.type = type
+        self.node = node
+        self.data = data or {}
+        self.state = state
+        self.timestamp = time.time()
+
+    def __repr__(self) -> str:
+        return f"GraphEvent(type={self.type!r}, node={self.node!r}, data={self.data!r})"
+
+
+def is_streaming() -> bool:
+    """True while the current code runs inside `GraphRunner.run_streamed()`."""
+    return _event_queue.get() is not None
+
+
+def emit(type: str, node: Optional[str] = None, **data: Any) -> None:
+    """Publishes an event to the streamed run this code belongs to, if any."""
+    queue = _event_queue.get()
+    if queue is not None:
+        queue.put_nowait(GraphEvent(type, node, data))
+
+
+@contextmanager
+def streaming_to(queue: asyncio.Queue) -> Iterator[asyncio.Queue]:
+    """Sends the events emitted inside the block (and by tasks it starts) to `queue`."""
+    token = _event_queue.set(queue)
+    try:
+        yield queue
+    finally:
+        _event_queue.reset(token)
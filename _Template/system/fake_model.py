@@ -0,0 +1,333 @@
+# system/fake_model.py
+"""
+An offline stand-in for an LLM, for deterministic tests and load tests.
+
+`FakeModel` implements the SDK's `Model` interface, so it plugs into
+`Agent(model=...)` exactly like `LitellmModel` does in Chapter 10. It never
+touches the network and needs no API key. Each call:
+
+1. waits for a configurable latency (a constant, a range, or any distribution),
+2. replies with, in order of precedence:
+   - the next entry of `script`, if one is left,
+   - whatever `responder(request)` returns, if a responder is given and returns a value,
+   - otherwise a default turn: call each of the agent's tools once with
+     schema-valid arguments, hand off to the best-matching handoff if there
+     is one, and finally answer with a placeholder text or a schema-valid
+     structured output,
+3. reports token usage estimated from the text sizes, so usage accounting
+   and metrics behave as they would with a real model.
+
+A script entry is one model turn: a string (a text message), a `FakeToolCall`,
+a Pydantic model or dict (rendered as JSON), or a list of these.
+
+Like every chapter, the template is self-contained, so Chapter 14 ships its
+own copy of this module (`Chapter-14/fake_model.py`). Change both together.
+"""
+import asyncio
+import itertools
+import json
+import math
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional, Union
+
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from pydantic import BaseModel
+
+from agents import Agent, FunctionTool, Model, ModelProvider, ModelResponse, Usage
+
+Latency = Union[float, tuple, Callable[[random.Random], float]]
+
+
+def lognormal_latency(median: float, sigma: float = 0.5) -> Callable[[random.Random], float]:
+    """A long-tailed latency distribution, which is what real LLM latencies look like."""
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+@dataclass
+class FakeToolCall:
+    """A scripted call to a tool (or a handoff, by its tool name, e.g. "transfer_to_mathagent")."""
+    name: str
+    arguments: Union[dict, str] = field(default_factory=dict)
+
+
+@dataclass
+class FakeRequest:
+    """Everything the model was given for one call, for use by a `responder`."""
+    system_instructions: Optional[str]
+    input: Any
+    tools: list
+    handoffs: list
+    output_schema: Any
+
+    @property
+    def user_message(self) -> str:
+        """The text of the latest user message."""
+        if isinstance(self.input, str):
+            return self.input
+        for item in reversed(self.input):
+            if isinstance(item, dict) and item.get("role") == "user":
+                content = item.get("content")
+                if isinstance(content, str):
+                    return content
+                return " ".join(part.get("text", "") for part in content or [] if isinstance(part, dict))
+        return ""
+
+    def calls_since_user_message(self) -> List[str]:
+        """The names of the tools and handoffs already called since the latest user message."""
+        if isinstance(self.input, str):
+            return []
+        names = []
+        for item in self.input:
+            item = item if isinstance(item, dict) else getattr(item, "model_dump", lambda: {})()
+            if item.get("role") == "user":
+                names = []
+            elif item.get("type") == "function_call":
+                names.append(item.get("name"))
+        return names
+
+
+def sample_from_schema(schema: dict, defs: Optional[dict] = None, name: str = "value", array_items: int = 1) -> Any:
+    """Builds a value that is valid against a (Pydantic-generated) JSON schema."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return sample_from_schema(defs[schema["$ref"].split("/")[-1]], defs, name, array_items)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "default" in schema and schema["default"] is not None:
+        return schema["default"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [option for option in schema[key] if option.get("type") != "null"] or schema[key]
+            return sample_from_schema(options[0], defs, name, array_items)
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object" or "properties" in schema:
+        return {
+            prop: sample_from_schema(sub, defs, prop, array_items)
+            for prop, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = max(array_items, schema.get("minItems", 0))
+        return [sample_from_schema(schema.get("items", {}), defs, name, array_items) for _ in range(count)]
+    if kind == "integer":
+        return max(1, schema.get("minimum", 1))
+    if kind == "number":
+        return float(max(1, schema.get("minimum", 1)))
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    string_format = schema.get("format")
+    if string_format == "date-time":
+        return "2024-01-01T00:00:00Z"
+    if string_format == "date":
+        return "2024-01-01"
+    if string_format in ("uri", "url"):
+        return f"https://example.com/{name}"
+    return f"sample {name}"
+
+
+def _overlap(query: str, text: str) -> int:
+    """Counts the query's words (4+ letters) that share a prefix with a word of `text` (e.g. forecast/forecasts)."""
+    words = [word for word in re.findall(r"\w+", (text or "").lower()) if len(word) > 3]
+    return sum(
+        1 for q in set(re.findall(r"\w+", query.lower())) if len(q) > 3
+        and any(word.startswith(q) or q.startswith(word) for word in words)
+    )
+
+
+class FakeModel(Model):
+    """
+    A scripted, offline `Model`.
+
+    Args:
+        script: Turns to replay in order (shared by every agent using this model).
+        responder: Called with a `FakeRequest`; returns a turn, or None for the default.
+        latency: Seconds per call: a float, a (low, high) range, or a callable taking a `random.Random`.
+        text: The final answer for agents without a structured output type.
+        call_tools: If False, the default turn never calls tools (handy when tools hit real services).
+        array_items: How many items to put in each array of a generated structured output.
+        seed: Seeds the latency distribution, for reproducible runs.
+    """
+    def __init__(
+        self,
+        script: Optional[Iterable[Any]] = None,
+        responder: Optional[Callable[[FakeRequest], Any]] = None,
+        latency: Latency = 0.0,
+        text: str = "This is a response from the fake model.",
+        call_tools: bool = True,
+        array_items: int = 1,
+        seed: Optional[int] = None,
+    ):
+        self.model = "fake-model"
+        self.script = list(script or [])
+        self.responder = responder
+        self.latency = latency
+        self.text = text
+        self.call_tools = call_tools
+        self.array_items = array_items
+        self._rng = random.Random(seed)
+        self._ids = itertools.count(1)
+        self.stats = {"calls": 0, "seconds_waited": 0.0}
+
+    # --- Turn Selection ---
+    def _sample_latency(self) -> float:
+        if callable(self.latency):
+            return max(0.0, float(self.latency(self._rng)))
+        if isinstance(self.latency, tuple):
+            return self._rng.uniform(*self.latency)
+        return float(self.latency)
+
+    def _default_turn(self, request: FakeRequest) -> List[Any]:
+        called = set(request.calls_since_user_message())
+        if self.call_tools:
+            pending = [
+                FakeToolCall(tool.name, sample_from_schema(tool.params_json_schema, array_items=self.array_items))
+                for tool in request.tools
+                if isinstance(tool, FunctionTool) and tool.name not in called
+            ]
+            if pending:
+                return pending
+        handoff_names = {handoff.tool_name for handoff in request.handoffs}
+        if request.handoffs and not called & handoff_names:
+            # Pick the handoff whose name and description share the most words with the query.
+            best = max(
+                request.handoffs,
+                key=lambda h: _overlap(request.user_message, f"{h.agent_name} {h.tool_description}"),
+            )
+            arguments = sample_from_schema(best.input_json_schema) if best.input_json_schema.get("properties") else {}
+            return [FakeToolCall(best.tool_name, arguments)]
+        schema = request.output_schema
+        if schema is not None and not schema.is_plain_text():
+            return [sample_from_schema(schema.json_schema(), array_items=self.array_items)]
+        return [self.text]
+
+    def _next_turn(self, request: FakeRequest) -> List[Any]:
+        if self.script:
+            turn = self.script.pop(0)
+        else:
+            turn = self.responder(request) if self.responder else None
+            if turn is None:
+                turn = self._default_turn(request)
+        return list(turn) if isinstance(turn, (list, tuple)) else [turn]
+
+    # --- Output Items ---
+    def _to_output_item(self, part: Any, output_schema: Any):
+        if isinstance(part, FakeToolCall):
+            arguments = part.arguments if isinstance(part.arguments, str) else json.dumps(part.arguments)
+            return ResponseFunctionToolCall(
+                id=f"fc_{next(self._ids)}", call_id=f"call_{next(self._ids)}", name=part.name,
+                arguments=arguments, type="function_call", status="completed",
+            )
+        if isinstance(part, BaseModel):
+            part = part.model_dump_json()
+        elif isinstance(part, (dict, list)):
+            part = json.dumps(part)
+        elif output_schema is not None and not output_schema.is_plain_text() and not isinstance(part, str):
+            part = json.dumps(part)
+        return ResponseOutputMessage(
+            id=f"msg_{next(self._ids)}", role="assistant", status="completed", type="message",
+            content=[ResponseOutputText(text=str(part), type="output_text", annotations=[])],
+        )
+
+    @staticmethod
+    def _estimate_usage(system_instructions: Optional[str], input: Any, output: list) -> Usage:
+        # Roughly four characters per token, like `count_tokens` without tiktoken.
+        prompt = (system_instructions or "") + (input if isinstance(input, str) else json.dumps(input, default=str))
+        completion = "".join(item.model_dump_json() for item in output)
+        input_tokens, output_tokens = (len(prompt) + 3) // 4, (len(completion) + 3) // 4
+        return Usage(requests=1, input_tokens=input_tokens, output_tokens=output_tokens, total_tokens=input_tokens + output_tokens)
+
+    async def _respond(self, system_instructions, input, tools, output_schema, handoffs) -> ModelResponse:
+        request = FakeRequest(system_instructions, input, list(tools), list(handoffs), output_schema)
+        turn = self._next_turn(request)
+        delay = self._sample_latency()
+        self.stats["calls"] += 1
+        self.stats["seconds_waited"] += delay
+        if delay:
+            await asyncio.sleep(delay)
+        output = [self._to_output_item(part, output_schema) for part in turn]
+        return ModelResponse(
+            output=output,
+            usage=self._estimate_usage(system_instructions, input, output),
+            response_id=f"resp_{next(self._ids)}",
+        )
+
+    # --- Model Interface ---
+    async def get_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, *args, **kwargs
+    ) -> ModelResponse:
+        return await self._respond(system_instructions, input, tools, output_schema, handoffs)
+
+    async def stream_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, *args, **kwargs
+    ) -> AsyncIterator[Any]:
+        response = await self._respond(system_instructions, input, tools, output_schema, handoffs)
+        sequence = itertools.count()
+        for index, item in enumerate(response.output):
+            if isinstance(item, ResponseOutputMessage):
+                # Stream the text word by word so consumers see realistic deltas.
+                for delta in re.findall(r"\S+\s*", item.content[0].text):
+                    yield ResponseTextDeltaEvent(
+                        type="response.output_text.delta", item_id=item.id, output_index=index,
+                        content_index=0, delta=delta, logprobs=[], sequence_number=next(sequence),
+                    )
+        usage = response.usage
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            sequence_number=next(sequence),
+            response=Response(
+                id=response.response_id, created_at=time.time(), model=self.model, object="response",
+                output=response.output, tool_choice="auto", tools=[], parallel_tool_calls=False,
+                usage=ResponseUsage(
+                    input_tokens=usage.input_tokens, output_tokens=usage.output_tokens, total_tokens=usage.total_tokens,
+                    input_tokens_details=usage.input_tokens_details, output_tokens_details=usage.output_tokens_details,
+                ),
+            ),
+        )
+
+
+class FakeModelProvider(ModelProvider):
+    """Serves one `FakeModel` for every model name, for use with `RunConfig(model_provider=...)`."""
+    def __init__(self, model: Optional[FakeModel] = None):
+        self.fake_model = model or FakeModel()
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return self.fake_model
+
+
+def use_fake_model(agents: Union[Agent, Iterable[Agent]], model: Optional[FakeModel] = None) -> FakeModel:
+    """
+    Points the given agents, and every agent reachable through their handoffs,
+    at a `FakeModel`. Returns the model so its `stats` can be inspected.
+    """
+    model = model or FakeModel()
+    pending = [agents] if isinstance(agents, Agent) else list(agents)
+    seen = set()
+    while pending:
+        agent = pending.pop()
+        if id(agent) in seen:
+            continue
+        seen.add(id(agent))
+        agent.model = model
+        for handoff in agent.handoffs:
+            agent_ref = getattr(handoff, "_agent_ref", None)
+            target = handoff if isinstance(handoff, Agent) else agent_ref() if callable(agent_ref) else None
+            if target is not None:
+                pending.append(target)
+    return model
@@ -4,51 +4,124 @@ Contains the generic, reusable engine for executing workflows defined as
 a graph of nodes and edges.
 """
 import asyncio
-from typing import Any, Dict, Callable, Coroutine
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Callable, Coroutine, Iterable, List, Set, Tuple
 from rich.console import Console
 
 from agents import Agent, Runner
 
-class WorkflowState(dict):
-    """
-    A dictionary-like object that holds the current state of the workflow.
-    It's passed between nodes, allowing agents to share information.
-    The use of __dict__ allows for attribute-style access (e.g., state.result).
-    """
-    def __init__(self, *args, **kwargs):
-        super(WorkflowState, self).__init__(*args, **kwargs)
-        self.__dict__ = self
+from system.checkpoint import CheckpointStore
+from system.events import GraphEvent, emit, streaming_to
+from system.metrics import RunMetrics, recording
+from system.state import WorkflowState
 
 class GraphNode:
-    """Represents a single agent or function as a node in the workflow graph."""
-    def __init__(self, name: str, action: Callable[[WorkflowState], Coroutine]):
+    """
+    Represents a single agent or function as a node in the workflow graph.
+    A node whose action raises is retried up to `retries` times, waiting
+    `retry_delay` seconds before the first retry and doubling it each time.
+    """
+    def __init__(self, name: str, action: Callable[[WorkflowState], Coroutine], retries: int = 0, retry_delay: float = 1.0):
         self.name = name
         self.action = action
+        self.retries = retries
+        self.retry_delay = retry_delay
 
     async def execute(self, state: WorkflowState) -> WorkflowState:
         """Executes the node's action with the current state."""
         return await self.action(state)
 
+def merge_branch_states(state: WorkflowState, branch_states: List[WorkflowState]) -> WorkflowState:
+    """
+    The default fan-in reducer for parallel edges.
+    Every key a branch added or changed is copied back into the shared state,
+    in branch order, so a later branch wins if two branches write the same key.
+    The history of each branch is appended after the parent's history.
+    """
+    # Compare every branch with the state as it was at the fork, not with the
+    # merged state: otherwise an untouched key in a later branch still holds
+    # the old value and would overwrite an earlier branch's write. A fork is a
+    # copy-on-write snapshot, so this copies no values.
+    parent = state.fork()
+    parent_history = list(state.history)
+    for branch_state in branch_states:
+        for key, value in branch_state.diff(parent).items():
+            if key != "history":
+                state[key] = value
+        state.history.extend(branch_state.history[len(parent_history):])
+    return state
+
+class ParallelEdge:
+    """
+    A fan-out/fan-in link: all `branches` start at once, and their results are
+    joined back into a single state by `reducer` before moving on to `join_node`.
+    """
+    def __init__(
+        self,
+        branches: List[str],
+        join_node: str,
+        reducer: Callable[[WorkflowState, List[WorkflowState]], WorkflowState] = merge_branch_states,
+    ):
+        self.branches = branches
+        self.join_node = join_node
+        self.reducer = reducer
+
+class GraphValidationError(ValueError):
+    """Raised by `GraphRunner.compile()` when a graph is malformed."""
+    def __init__(self, problems: List[str]):
+        self.problems = problems
+        super().__init__("Invalid workflow graph:\n- " + "\n- ".join(problems))
+
 class GraphRunner:
-    """Executes a workflow defined as a graph of nodes and conditional edges."""
-    def __init__(self, console: Console):
+    """
+    Executes a workflow defined as a graph of nodes and conditional edges.
+
+    Every run is bounded: it stops cleanly once `max_steps` nodes have been
+    executed or, if `max_tokens` is set, once the nodes' recorded model tokens
+    exceed it. The returned state then carries the reason in `abort_reason`.
+    Both are checked before a fan-out, whose branches count as steps, so a
+    parallel edge never starts branches the budget cannot pay for.
+    """
+    def __init__(
+        self,
+        console: Console,
+        checkpoint_store: CheckpointStore | None = None,
+        max_steps: int = 50,
+        max_tokens: int | None = None,
+    ):
         self.console = console
+        self.checkpoint_store = checkpoint_store
+        self.max_steps = max_steps
+        self.max_tokens = max_tokens
         self.nodes: Dict[str, GraphNode] = {}
         self.edges: Dict[str, Callable[[WorkflowState], str]] = {}
+        self.parallel_edges: Dict[str, ParallelEdge] = {}
         self.entry_point: str | None = None
         self.finish_point = "FINISH" # A special node name to end the workflow
+        # Every node each edge can lead to, recorded as edges are added so
+        # `compile()` can check the graph before it runs.
+        self._edge_targets: Dict[str, Set[str]] = {}
+        self.compiled = False
 
     def add_node(self, node: GraphNode):
         """Adds a processing step (e.g., an agent) to the graph."""
         self.nodes[node.name] = node
+        self.compiled = False
 
     def set_entry_point(self, node_name: str):
         """Sets the starting node of the graph."""
         self.entry_point = node_name
+        self.compiled = False
+
+    def _set_edge(self, start_node: str, router: Callable[[WorkflowState], str], targets: Iterable[str]):
+        self.edges[start_node] = router
+        self._edge_targets[start_node] = set(targets)
+        self.compiled = False
 
     def add_edge(self, start_node: str, end_node: str):
         """Adds a direct, unconditional link from one node to another."""
-        self.edges[start_node] = lambda state: end_node
+        self._set_edge(start_node, lambda state: end_node, [end_node])
 
     def add_conditional_edge(self, start_node: str, path_map: Dict[str, str]):
         """
@@ -59,30 +132,308 @@ class GraphRunner:
         def router(state: WorkflowState) -> str:
             next_node_key = state.get("next_node", self.finish_point)
             return path_map.get(next_node_key, self.finish_point)
-        self.edges[start_node] = router
+        # Unknown keys fall through to the finish point, so it is always a possible target.
+        self._set_edge(start_node, router, [*path_map.values(), self.finish_point])
 
-    async def run(self, initial_input: Any) -> WorkflowState:
-        """Runs the graph from the entry point until a terminal node is reached."""
+    def add_parallel_edge(
+        self,
+        start_node: str,
+        branches: List[str],
+        join_node: str,
+        reducer: Callable[[WorkflowState, List[WorkflowState]], WorkflowState] = merge_branch_states,
+    ):
+        """
+        Adds a fan-out/fan-in link. After `start_node` finishes, every node in
+        `branches` runs concurrently on its own copy of the state. The copies
+        are then combined by `reducer(state, branch_states)` and the workflow
+        continues at `join_node` (which may be `finish_point`). A branch runs
+        only its own node: edges that leave a branch node are not followed.
+        """
+        if not branches:
+            raise ValueError("A parallel edge needs at least one branch.")
+        self.parallel_edges[start_node] = ParallelEdge(branches, join_node, reducer)
+        self._set_edge(start_node, lambda state: join_node, [join_node])
+
+    def compile(self) -> "GraphRunner":
+        """
+        Checks the graph before it runs.
+        Raises `GraphValidationError` listing every problem found:
+        - no entry point, or an entry point that is not a node;
+        - edges that start at, lead to or branch into unknown nodes
+          (e.g. a typo in a `path_map`);
+        - nodes that can never be reached from the entry point;
+        - nodes from which the workflow can never finish (a cycle with no exit).
+        Cycles that do have an exit are allowed; the step budget bounds them.
+        A branch node that has its own outgoing edge only gets a warning, since
+        that edge is not followed when the node runs as a branch.
+        """
+        problems = []
         if not self.entry_point:
-            raise ValueError("Graph entry point not set.")
+            problems.append("No entry point set.")
+        elif self.entry_point not in self.nodes:
+            problems.append(f"Entry point '{self.entry_point}' is not a node.")
+
+        adjacency: Dict[str, Tuple[str, ...]] = {}
+        for start, targets in self._edge_targets.items():
+            if start not in self.nodes:
+                problems.append(f"Edge starts at unknown node '{start}'.")
+            branches = self.parallel_edges[start].branches if start in self.parallel_edges else []
+            for branch in branches:
+                if branch not in self.nodes:
+                    problems.append(f"Parallel edge from '{start}' branches into unknown node '{branch}'.")
+                elif branch in self._edge_targets:
+                    self.console.print(
+                        f"[yellow]Warning: '{branch}' is a branch of the parallel edge from '{start}'; "
+                        f"its own outgoing edge is ignored there (the run continues at "
+                        f"'{self.parallel_edges[start].join_node}').[/yellow]"
+                    )
+            for target in sorted(targets):
+                if target != self.finish_point and target not in self.nodes:
+                    problems.append(f"Edge from '{start}' leads to unknown node '{target}'.")
+            adjacency[start] = tuple(sorted(targets))
+
+        if not problems:
+            reachable = self._reachable_from([self.entry_point], adjacency)
+            for name in self.nodes:
+                if name not in reachable:
+                    problems.append(f"Node '{name}' is unreachable from the entry point '{self.entry_point}'.")
+            # A node can finish if it has no outgoing edge (terminal) or an edge to the finish point,
+            # or leads to a node that can. Propagate backwards until nothing changes.
+            can_finish = {name for name in self.nodes if self.finish_point in adjacency.get(name, (self.finish_point,))}
+            changed = True
+            while changed:
+                changed = False
+                for name, targets in adjacency.items():
+                    if name not in can_finish and any(target in can_finish for target in targets):
+                        can_finish.add(name)
+                        changed = True
+            for name in sorted(reachable - can_finish):
+                problems.append(f"Node '{name}' is in a cycle that can never reach '{self.finish_point}'.")
+
+        if problems:
+            raise GraphValidationError(problems)
+        self.compiled = True
+        return self
+
+    def _reachable_from(self, starts: List[str], adjacency: Dict[str, Tuple[str, ...]]) -> Set[str]:
+        """Every node reachable from `starts`, following edges and parallel branches."""
+        seen, pending = set(), list(starts)
+        while pending:
+            name = pending.pop()
+            if name in seen or name == self.finish_point:
+                continue
+            seen.add(name)
+            pending.extend(adjacency.get(name, ()))
+            if name in self.parallel_edges:
+                pending.extend(self.parallel_edges[name].branches)
+        return seen
+
+    async def _run_branch(self, node_name: str, state: WorkflowState) -> WorkflowState:
+        """Executes one branch of a parallel edge on an isolated copy of the state."""
+        node = self.nodes.get(node_name)
+        if not node:
+            raise ValueError(f"Node '{node_name}' not found in graph.")
+        branch_state = state.fork() # Shares the parent's values; copies only what the branch writes
+        branch_state.history = state.history + [node_name]
+        return await self._execute_node(node, branch_state)
+
+    async def _execute_node(self, node: GraphNode, state: WorkflowState) -> WorkflowState:
+        """
+        Executes a node with its retries and records a `NodeMetrics` entry in
+        `state.metrics`. Agents run with `system.metrics.run_agent` inside the
+        action add their token usage and tool calls to that entry.
+        """
+        entry = state.metrics.start_node(node.name)
+        started = time.perf_counter()
+        emit("node_start", node.name)
+        try:
+            with recording(entry):
+                for attempt in range(node.retries + 1):
+                    entry.attempts += 1
+                    try:
+                        result = await node.execute(state)
+                        entry.status = "ok"
+                        return result
+                    except Exception as e:
+                        if attempt == node.retries:
+                            entry.status, entry.error = "error", f"{type(e).__name__}: {e}"
+                            raise
+                        delay = node.retry_delay * 2 ** attempt
+                        self.console.print(f"[yellow]Node '{node.name}' failed ({e}); retrying in {delay:.1f}s...[/yellow]")
+                        await asyncio.sleep(delay)
+        finally:
+            entry.wall_seconds = time.perf_counter() - started
+            emit(
+                "node_end", node.name, status=entry.status, wall_seconds=entry.wall_seconds,
+                input_tokens=entry.input_tokens, output_tokens=entry.output_tokens, tool_calls=entry.tool_calls,
+            )
+
+    async def _run_parallel(self, edge: ParallelEdge, state: WorkflowState) -> WorkflowState:
+        """Fans out to every branch of `edge` and joins their results."""
+        self.console.print(
+            f"\n[bold magenta]Forking into parallel branches:[/bold magenta] {', '.join(edge.branches)}"
+        )
+        branch_states = await asyncio.gather(
+            *(self._run_branch(name, state) for name in edge.branches)
+        )
+        return edge.reducer(state, list(branch_states))
+
+    async def run(self, initial_input: Any, run_id: str | None = None) -> WorkflowState:
+        """
+        Runs the graph from the entry point until a terminal node is reached.
+        If a checkpoint store is configured, the state is saved after every
+        node under `run_id` (a new id is generated if none is given).
+        """
+        if not self.compiled:
+            self.compile()
 
         state = WorkflowState(initial_input=initial_input, history=[])
-        current_node_name = self.entry_point
+        state.run_id = run_id or uuid.uuid4().hex
+        state.metrics = RunMetrics(run_id=state.run_id)
+        state.abort_reason = None
+        return await self._execute(state, self.entry_point, step=0)
 
+    async def run_streamed(self, initial_input: Any, run_id: str | None = None) -> AsyncIterator[GraphEvent]:
+        """
+        Runs the graph like `run`, but yields `GraphEvent`s while it runs:
+        node_start, token_delta and tool_call (from agents run with
+        `system.metrics.run_agent`), node_end, and finally run_end, whose
+        `state` is the final WorkflowState. If the run fails, an "error"
+        event is yielded and the exception is re-raised.
+
+            async for event in graph_runner.run_streamed(query):
+                if event.type == "token_delta":
+                    print(event.data["delta"], end="", flush=True)
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def produce():
+            # The queue is installed inside this task, so only this run's events reach it.
+            with streaming_to(queue):
+                try:
+                    state = await self.run(initial_input, run_id)
+                    queue.put_nowait(GraphEvent("run_end", data={"abort_reason": state.abort_reason}, state=state))
+                except Exception as e:
+                    queue.put_nowait(GraphEvent("error", data={"error": f"{type(e).__name__}: {e}"}))
+                    raise
+                finally:
+                    queue.put_nowait(done)
+
+        task = asyncio.create_task(produce())
+        try:
+            while (event := await queue.get()) is not done:
+                yield event
+            await task # Re-raises the run's exception, if any.
+        finally:
+            if not task.done():
+                # The consumer stopped early: cancel the run instead of leaving it behind.
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def resume(self, run_id: str) -> WorkflowState:
+        """
+        Restarts a previously checkpointed run from the node after the last
+        one that completed, instead of from the entry point. A run stopped
+        before a fork continues with the fork's branches.
+        """
+        if not self.checkpoint_store:
+            raise ValueError("Cannot resume: no checkpoint store configured.")
+        if not self.compiled:
+            self.compile()
+        checkpoint = self.checkpoint_store.load(run_id)
+        if not checkpoint:
+            raise ValueError(f"No checkpoint found for run '{run_id}'.")
+
+        resume_point = f"branches of {checkpoint.next_node}" if checkpoint.fork_pending else checkpoint.next_node
+        self.console.print(
+            f"\n[bold cyan]Resuming run {run_id} at step {checkpoint.step}:[/bold cyan] {resume_point}"
+        )
+        state = WorkflowState(checkpoint.state)
+        # Checkpoints store the metrics as a dict; the nodes that ran before the crash stay counted.
+        state.metrics = RunMetrics.model_validate(state.get("metrics") or {"run_id": run_id})
+        state.abort_reason = None
+        return await self._execute(
+            state, checkpoint.next_node, step=checkpoint.step, fork_pending=checkpoint.fork_pending
+        )
+
+    def _save_checkpoint(self, state: WorkflowState, next_node: str, step: int, fork_pending: bool = False):
+        """
+        Saves the state reached after `step` nodes, if checkpointing is enabled.
+        With `fork_pending`, `next_node` has already run and only its parallel branches remain.
+        """
+        if self.checkpoint_store:
+            self.checkpoint_store.save(
+                self.checkpoint_store.make_checkpoint(state.run_id, step, next_node, state, fork_pending)
+            )
+
+    def _budget_exceeded(self, state: WorkflowState, step: int, upcoming: int = 1) -> str | None:
+        """
+        Returns why the run must stop before executing `upcoming` more nodes,
+        or None if it is within its budgets.
+        """
+        if step + upcoming > self.max_steps:
+            return (
+                f"Step budget exhausted: {step} of {self.max_steps} nodes executed, "
+                f"the next step needs {upcoming}."
+            )
+        if self.max_tokens is not None:
+            used = state.metrics.input_tokens + state.metrics.output_tokens
+            if used >= self.max_tokens:
+                return f"Token budget exhausted: {used} of {self.max_tokens} tokens used."
+        return None
+
+    async def _execute(
+        self, state: WorkflowState, current_node_name: str, step: int, fork_pending: bool = False,
+    ) -> WorkflowState:
+        """
+        The main loop shared by `run` and `resume`. With `fork_pending`, the
+        first node has already run and the loop starts with its parallel branches.
+        """
         while current_node_name != self.finish_point:
-            self.console.print(f"\n[bold magenta]Entering Node:[/bold magenta] {current_node_name}")
-            node = self.nodes.get(current_node_name)
-            if not node:
-                raise ValueError(f"Node '{current_node_name}' not found in graph.")
+            # A node with a parallel edge also runs all of its branches, so they count up front.
+            edge = self.parallel_edges.get(current_node_name)
+            upcoming = (0 if fork_pending else 1) + (len(edge.branches) if edge else 0)
+            abort_reason = self._budget_exceeded(state, step, upcoming)
+            if abort_reason:
+                # Stop before the next node; the checkpoint still points at it, so the
+                # run can be resumed later (e.g. by a runner with a larger budget).
+                state.abort_reason = abort_reason
+                self._save_checkpoint(state, current_node_name, step, fork_pending)
+                self.console.print(f"\n[bold red]⛔ Workflow aborted before '{current_node_name}':[/bold red] {abort_reason}")
+                return state
+
+            if not fork_pending:
+                self.console.print(f"\n[bold magenta]Entering Node:[/bold magenta] {current_node_name}")
+                node = self.nodes.get(current_node_name)
+                if not node:
+                    raise ValueError(f"Node '{current_node_name}' not found in graph.")
+
+                state.history.append(current_node_name)
+                state = await self._execute_node(node, state) # Execute the node's logic
+                step += 1
+            fork_pending = False
 
-            state.history.append(current_node_name)
-            state = await node.execute(state) # Execute the node's logic
+            if edge:
+                # The node itself may have used up the token budget; don't fork if so.
+                abort_reason = self._budget_exceeded(state, step, len(edge.branches))
+                if abort_reason:
+                    # The node has run; the checkpoint marks only its branches as still to do.
+                    state.abort_reason = abort_reason
+                    self._save_checkpoint(state, current_node_name, step, fork_pending=True)
+                    self.console.print(f"\n[bold red]⛔ Workflow aborted before forking from '{current_node_name}':[/bold red] {abort_reason}")
+                    return state
+                state = await self._run_parallel(edge, state)
+                step += len(edge.branches)
 
             if current_node_name not in self.edges:
+                self._save_checkpoint(state, self.finish_point, step)
                 break # Reached a terminal node with no defined exit path
 
             router = self.edges[current_node_name]
             current_node_name = router(state)
+            self._save_checkpoint(state, current_node_name, step)
 
         self.console.print("\n[bold green]✅ Workflow Finished.[/bold green]")
-        return state
\ No newline at end of file
+        self.console.print(f"[grey50]{state.metrics.summary()}[/grey50]")
+        return state
@@ -0,0 +1,221 @@
+# system/metrics.py
+"""
+Per-node metrics for graph workflows.
+
+The GraphRunner records one `NodeMetrics` entry for every node it executes:
+wall time, attempts (so retries are visible), and whether it failed. Model
+usage is added by running agents through `run_agent()` instead of
+`Runner.run()` inside node actions: it reads the token usage and tool calls
+off each result and adds them to the node that is currently executing (and,
+during a streamed run, streams the agent's output; see `system/events.py`).
+
+All entries of one run are collected in a `RunMetrics`, attached to the
+returned state as `state.metrics`. Both are Pydantic models, so they are
+checkpointed with the rest of the state, and `to_prometheus()` renders any
+number of runs in the Prometheus text (or OpenMetrics) exposition format.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from openai.types.responses import ResponseTextDeltaEvent
+from pydantic import BaseModel, Field
+
+from agents import Agent, Runner
+from agents.items import ToolCallItem
+
+from system.events import emit, is_streaming
+
+# The metrics entry of the node currently executing, if any (set by the GraphRunner).
+_current_node: ContextVar[Optional["NodeMetrics"]] = ContextVar("current_node_metrics", default=None)
+
+
+class NodeMetrics(BaseModel):
+    """What one execution of one node cost."""
+    node: str
+    started_at: float = Field(default_factory=time.time)
+    wall_seconds: float = 0.0
+    attempts: int = 0
+    status: str = "running" # "ok" or "error" once finished
+    error: Optional[str] = None
+    model_requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tool_calls: int = 0
+    tokens_by_model: Dict[str, List[int]] = Field(default_factory=dict, description="model -> [input, output] tokens")
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+    def record_result(self, result: Any, model: Optional[str] = None) -> None:
+        """Adds the usage and tool calls of a `RunResult` to this node."""
+        usage = result.context_wrapper.usage
+        self.model_requests += usage.requests
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        self.tool_calls += sum(isinstance(item, ToolCallItem) for item in result.new_items)
+        if model:
+            totals = self.tokens_by_model.setdefault(model, [0, 0])
+            totals[0] += usage.input_tokens
+            totals[1] += usage.output_tokens
+
+
+class RunMetrics(BaseModel):
+    """Every node execution of one workflow run, in the order they started."""
+    run_id: Optional[str] = None
+    nodes: List[NodeMetrics] = Field(default_factory=list)
+
+    def start_node(self, node: str) -> NodeMetrics:
+        entry = NodeMetrics(node=node)
+        self.nodes.append(entry)
+        return entry
+
+    @property
+    def wall_seconds(self) -> float:
+        return sum(entry.wall_seconds for entry in self.nodes)
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(entry.input_tokens for entry in self.nodes)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(entry.output_tokens for entry in self.nodes)
+
+    def by_node(self) -> Dict[str, Dict[str, float]]:
+        """Totals per node name (a node can run more than once, e.g. in a loop)."""
+        totals: Dict[str, Dict[str, float]] = {}
+        for entry in self.nodes:
+            node = totals.setdefault(entry.node, {
+                "executions": 0, "wall_seconds": 0.0, "input_tokens": 0, "output_tokens": 0,
+                "tool_calls": 0, "retries": 0, "errors": 0,
+            })
+            node["executions"] += 1
+            node["wall_seconds"] += entry.wall_seconds
+            node["input_tokens"] += entry.input_tokens
+            node["output_tokens"] += entry.output_tokens
+            node["tool_calls"] += entry.tool_calls
+            node["retries"] += entry.retries
+            node["errors"] += entry.status == "error"
+        return totals
+
+    def cost(self, prices: Dict[str, Tuple[float, float]]) -> float:
+        """
+        Estimates spend from `prices`, a map of model name to (input, output)
+        price per million tokens. Models missing from `prices` count as free.
+        """
+        total = 0.0
+        for entry in self.nodes:
+            for model, (input_tokens, output_tokens) in entry.tokens_by_model.items():
+                input_price, output_price = prices.get(model, (0.0, 0.0))
+                total += (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+        return total
+
+    def summary(self) -> str:
+        """One line per node: time, tokens and tool calls, slowest first."""
+        rows = sorted(self.by_node().items(), key=lambda item: item[1]["wall_seconds"], reverse=True)
+        return "\n".join(
+            f"{name}: {totals['wall_seconds']:.2f}s over {totals['executions']} run(s), "
+            f"{totals['input_tokens']} in / {totals['output_tokens']} out tokens, "
+            f"{totals['tool_calls']} tool calls, {totals['retries']} retries"
+            for name, totals in rows
+        )
+
+
+@contextmanager
+def recording(entry: NodeMetrics) -> Iterator[NodeMetrics]:
+    """Makes `entry` the current node's metrics for the code (and tasks it starts) inside the block."""
+    token = _current_node.set(entry)
+    try:
+        yield entry
+    finally:
+        _current_node.reset(token)
+
+
+def current_node_metrics() -> Optional[NodeMetrics]:
+    """The metrics entry of the node that is executing right now, if any."""
+    return _current_node.get()
+
+
+def _model_name(agent: Agent) -> Optional[str]:
+    if isinstance(agent.model, str) or agent.model is None:
+        return agent.model
+    return getattr(agent.model, "model", type(agent.model).__name__)
+
+
+async def _run_streamed(agent: Agent, input: Any, node: Optional[str], **kwargs):
+    """Runs the agent with the streaming runner, emitting token deltas and tool calls."""
+    result = Runner.run_streamed(agent, input, **kwargs)
+    async for event in result.stream_events():
+        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            emit("token_delta", node, delta=event.data.delta, agent=result.current_agent.name)
+        elif event.type == "run_item_stream_event" and event.name == "tool_called":
+            raw = event.item.raw_item
+            emit(
+                "tool_call", node, agent=event.item.agent.name,
+                tool=getattr(raw, "name", None) or type(raw).__name__, arguments=getattr(raw, "arguments", None),
+            )
+    return result
+
+
+async def run_agent(agent: Agent, input: Any, **kwargs):
+    """
+    `Runner.run(agent, input, **kwargs)`, plus its token usage and tool calls
+    added to the current node's metrics. Inside `GraphRunner.run_streamed()`
+    it uses `Runner.run_streamed` and emits the output as it is generated.
+    Works outside a graph too (it then only runs the agent).
+    """
+    entry = _current_node.get()
+    if is_streaming():
+        result = await _run_streamed(agent, input, entry.node if entry else None, **kwargs)
+    else:
+        result = await Runner.run(agent, input, **kwargs)
+    if entry is not None:
+        entry.record_result(result, _model_name(result.last_agent) or _model_name(agent))
+    return result
+
+
+# --- Exporter ---
+_METRICS = [
+    # (name, type, help, field of the per-node totals)
+    ("node_executions", "counter", "Number of times the node ran.", "executions"),
+    ("node_duration_seconds", "counter", "Total wall time spent in the node.", "wall_seconds"),
+    ("node_input_tokens", "counter", "Model input tokens used by the node.", "input_tokens"),
+    ("node_output_tokens", "counter", "Model output tokens used by the node.", "output_tokens"),
+    ("node_tool_calls", "counter", "Tool calls made by agents in the node.", "tool_calls"),
+    ("node_retries", "counter", "Retried attempts of the node.", "retries"),
+    ("node_errors", "counter", "Node executions that failed after all retries.", "errors"),
+]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def to_prometheus(runs: RunMetrics | Iterable[RunMetrics], prefix: str = "workflow", openmetrics: bool = False) -> str:
+    """
+    Renders per-node totals across `runs` in the Prometheus text exposition
+    format, or OpenMetrics (with its `# EOF` terminator) if `openmetrics`.
+    Serve the result from any HTTP endpoint for Prometheus to scrape.
+    """
+    runs = [runs] if isinstance(runs, RunMetrics) else list(runs)
+    totals: Dict[str, Dict[str, float]] = {}
+    for run in runs:
+        for node, node_totals in run.by_node().items():
+            merged = totals.setdefault(node, dict.fromkeys(node_totals, 0))
+            for key, value in node_totals.items():
+                merged[key] += value
+
+    lines = []
+    for name, kind, help_text, field in _METRICS:
+        # OpenMetrics names the counter family without the `_total` suffix its samples carry.
+        family = f"{prefix}_{name}" if openmetrics else f"{prefix}_{name}_total"
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        for node, node_totals in sorted(totals.items()):
+            lines.append(f'{prefix}_{name}_total{{node="{_escape(node)}"}} {node_totals[field]:g}')
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
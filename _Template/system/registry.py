@@ -0,0 +1,121 @@
+# system/registry.py
+"""
+A lazy agent registry and project discovery.
+
+Building an `Agent` is cheap, but building *every* agent of a project means
+importing every tool module they use (and whatever heavy libraries those
+tools pull in) before the first query is even read. An `AgentRegistry` holds
+factories instead of agents: an agent is only built, and its tools only
+imported, the first time someone asks for it. After that the same instance
+is returned, so handoff graphs stay consistent.
+
+Projects are discovered by name: any `projects/<name>/config.py` that defines
+an `AGENTS` registry can be loaded with `load_project("<name>")`. The time
+spent importing the config and building each agent is recorded, so slow
+projects and slow agents are easy to spot.
+"""
+import importlib
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from agents import Agent
+
+PROJECTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'projects')
+
+AgentFactory = Callable[["AgentRegistry"], Agent]
+
+
+class AgentRegistry:
+    """
+    Maps keys (e.g. "triage") to agent factories and builds agents on first use.
+
+    Factories receive the registry itself, so an agent can reference other
+    agents (e.g. for handoffs) with `registry["math"]`, building them only then.
+    """
+    def __init__(self):
+        self._factories: Dict[str, AgentFactory] = {}
+        self._agents: Dict[str, Agent] = {}
+        self.build_seconds: Dict[str, float] = {}
+        self.import_seconds: Optional[float] = None # Set by `load_project`
+        self.model_override = None # A `Model` given to every agent built from now on (e.g. a FakeModel)
+
+    def register(self, key: str) -> Callable[[AgentFactory], AgentFactory]:
+        """Decorator that registers a factory under `key`."""
+        def decorator(factory: AgentFactory) -> AgentFactory:
+            self._factories[key] = factory
+            return factory
+        return decorator
+
+    def __getitem__(self, key: str) -> Agent:
+        agent = self._agents.get(key)
+        if agent is None:
+            factory = self._factories[key] # Unknown keys raise KeyError, like a dict.
+            started = time.perf_counter()
+            agent = factory(self)
+            if self.model_override is not None:
+                agent.model = self.model_override
+            self.build_seconds[key] = time.perf_counter() - started
+            self._agents[key] = agent
+        return agent
+
+    def get(self, key: str, default: Optional[Agent] = None) -> Optional[Agent]:
+        return self[key] if key in self._factories else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def keys(self) -> List[str]:
+        return list(self._factories)
+
+    def built(self) -> Dict[str, Agent]:
+        """The agents that have been built so far (nothing else is built)."""
+        return dict(self._agents)
+
+    def key_for(self, agent: Agent) -> Optional[str]:
+        """Returns the key of an agent that was built by this registry."""
+        for key, built in self._agents.items():
+            if built is agent or built.name == agent.name:
+                return key
+        return None
+
+    def timings(self) -> str:
+        """A one-line, human-readable report of import and build costs."""
+        parts = [f"import {self.import_seconds * 1000:.1f}ms"] if self.import_seconds is not None else []
+        parts += [f"{key} {seconds * 1000:.1f}ms" for key, seconds in self.build_seconds.items()]
+        return ", ".join(parts) or "nothing built yet"
+
+
+def discover_projects(projects_dir: str = PROJECTS_DIR) -> List[str]:
+    """Lists the projects (sub-directories with a `config.py`), without importing them."""
+    if not os.path.isdir(projects_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(projects_dir)
+        if os.path.isfile(os.path.join(projects_dir, name, "config.py"))
+    )
+
+
+def load_project(name: str) -> AgentRegistry:
+    """
+    Imports `projects/<name>/config.py` and returns its `AGENTS` registry,
+    with the import time recorded in `import_seconds`.
+    """
+    available = discover_projects()
+    if name not in available:
+        raise ValueError(f"Unknown project '{name}'. Available projects: {', '.join(available) or 'none'}.")
+    started = time.perf_counter()
+    module = importlib.import_module(f"projects.{name}.config")
+    elapsed = time.perf_counter() - started
+    registry = getattr(module, "AGENTS", None)
+    if not isinstance(registry, AgentRegistry):
+        raise ValueError(f"Configuration error: projects/{name}/config.py must define AGENTS = AgentRegistry().")
+    if registry.import_seconds is None:
+        registry.import_seconds = elapsed
+    return registry
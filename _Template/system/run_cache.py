@@ -0,0 +1,257 @@
+# system/run_cache.py
+"""
+A two-tier cache for `Runner.run` results.
+
+Regression suites and dashboards send the same prompts through the same
+agents again and again. `RunCache.run` is a drop-in replacement for
+`Runner.run` that first looks the call up by a key built from everything that
+determines the answer: the agent's instructions, model, model settings, tool
+schemas, output type and handoffs (recursively), plus the input. Hits are
+served from an in-memory LRU, then from SQLite; misses run the agent and
+store its final output.
+
+Agents whose runs have side effects (e.g. a tool that saves a file) should be
+opted out with `exclude`, since a cache hit skips their tools entirely. Agents
+that return live data (weather, search results) should be excluded too, or
+given a short TTL with `ttls`. A run that hands off to an excluded agent is
+not cached either.
+
+Like every chapter, the template is self-contained, so Chapter 14 ships its
+own copy of this module (`Chapter-14/run_cache.py`). The copies are kept
+identical apart from the cache path; change both together.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from pydantic import BaseModel
+
+from agents import Agent, Runner
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), '..', '.cache', 'run_cache.db')
+
+
+def _handoff_agent(handoff: Any) -> Optional[Agent]:
+    """Resolves a handoff entry (an Agent or a `Handoff` object) to its target agent, if possible."""
+    if isinstance(handoff, Agent):
+        return handoff
+    agent_ref = getattr(handoff, "_agent_ref", None)
+    return agent_ref() if callable(agent_ref) else None
+
+
+class CachedRunResult:
+    """Stands in for a `RunResult` when the answer comes from the cache."""
+    def __init__(self, final_output: Any, last_agent: Agent):
+        self.final_output = final_output
+        self.last_agent = last_agent
+        self.from_cache = True
+
+    def final_output_as(self, cls, raise_if_incorrect_type: bool = False):
+        return self.final_output
+
+
+class RunCache:
+    """
+    Caches agent run results in memory (LRU) and, optionally, in SQLite.
+
+    Args:
+        db_path: SQLite file for the persistent tier, or None for memory only.
+        max_memory_entries: Size of the in-memory LRU tier.
+        ttl_seconds: How long an entry stays valid.
+        exclude: Agents (or agent names) that must never be cached.
+        ttls: Per-agent TTLs, by agent name, that replace `ttl_seconds`.
+    """
+    def __init__(
+        self,
+        db_path: Optional[str] = CACHE_PATH,
+        max_memory_entries: int = 256,
+        ttl_seconds: float = 24 * 3600,
+        exclude: Iterable[Agent | str] = (),
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.ttls = dict(ttls or {})
+        self.max_memory_entries = max_memory_entries
+        self.excluded = {agent if isinstance(agent, str) else agent.name for agent in exclude}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "skipped": 0}
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path:
+            if db_path != ":memory:":
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS run_cache (key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+
+    def exclude(self, agent: Agent | str) -> None:
+        """Opts an agent out of caching."""
+        self.excluded.add(agent if isinstance(agent, str) else agent.name)
+
+    # --- Keys ---
+    def _fingerprint(self, agent: Agent, seen: set) -> Any:
+        """Everything about an agent that can change its output, as plain data."""
+        if id(agent) in seen:
+            return agent.name # Handoff cycles: the agent is already described above.
+        seen.add(id(agent))
+        if callable(agent.instructions):
+            raise TypeError("dynamic instructions")
+        model = agent.model if isinstance(agent.model, (str, type(None))) else getattr(agent.model, "model", type(agent.model).__name__)
+        output_type = agent.output_type
+        if isinstance(output_type, type) and issubclass(output_type, BaseModel):
+            output_type = output_type.model_json_schema()
+        tools = [
+            {"name": getattr(tool, "name", type(tool).__name__), "schema": getattr(tool, "params_json_schema", None)}
+            for tool in agent.tools
+        ]
+        handoffs = [
+            self._fingerprint(_handoff_agent(h), seen) if _handoff_agent(h)
+            else [getattr(h, "agent_name", repr(h)), getattr(h, "tool_description", None)]
+            for h in agent.handoffs
+        ]
+        settings = asdict(agent.model_settings) if is_dataclass(agent.model_settings) else None
+        return {
+            "name": agent.name,
+            "instructions": agent.instructions,
+            "model": model,
+            "settings": settings,
+            "tools": tools,
+            "output_type": output_type if isinstance(output_type, (dict, type(None))) else repr(output_type),
+            "handoffs": handoffs,
+        }
+
+    def make_key(self, agent: Agent, input: Any) -> Optional[str]:
+        """Returns the cache key for a run, or None if the run cannot be cached."""
+        if agent.name in self.excluded:
+            return None
+        try:
+            fingerprint = self._fingerprint(agent, set())
+            data = json.dumps({"agent": fingerprint, "input": input}, sort_keys=True, default=str)
+        except TypeError:
+            return None
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    # --- Storage ---
+    @staticmethod
+    def _find_agent(root: Agent, name: str) -> Optional[Agent]:
+        """Finds the agent called `name` among `root` and its (nested) handoffs."""
+        pending, seen = [root], set()
+        while pending:
+            agent = pending.pop()
+            if id(agent) in seen:
+                continue
+            seen.add(id(agent))
+            if agent.name == name:
+                return agent
+            pending.extend(target for target in map(_handoff_agent, agent.handoffs) if target)
+        return None
+
+    def lookup(self, agent: Agent, input: Any) -> Optional[CachedRunResult]:
+        """Returns the cached result for this run, if there is a valid one."""
+        key = self.make_key(agent, input)
+        if key is None:
+            self.stats["skipped"] += 1
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                payload = entry[1]
+            else:
+                payload = None
+                if self._conn is not None:
+                    row = self._conn.execute(
+                        "SELECT payload, expires_at FROM run_cache WHERE key = ? AND expires_at > ?", (key, now)
+                    ).fetchone()
+                    if row:
+                        payload = row[0]
+                        self.stats["disk_hits"] += 1
+                        self._remember(key, row[1], payload)
+        if payload is None:
+            self.stats["misses"] += 1
+            return None
+
+        data = json.loads(payload)
+        last_agent = self._find_agent(agent, data["last_agent"]) or agent
+        output = data["output"]
+        output_type = last_agent.output_type
+        if data["is_model"] and isinstance(output_type, type) and issubclass(output_type, BaseModel):
+            output = output_type.model_validate(output)
+        return CachedRunResult(output, last_agent)
+
+    def _remember(self, key: str, expires_at: float, payload: str) -> None:
+        self._memory[key] = (expires_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def store(self, agent: Agent, input: Any, result: Any) -> None:
+        """Saves a run's final output (only JSON-friendly outputs are cached)."""
+        key = self.make_key(agent, input)
+        last_agent = result.last_agent.name
+        if key is None or last_agent in self.excluded:
+            return
+        # The shortest TTL of the agents involved applies (e.g. triage handing off to a live-data agent).
+        ttl_seconds = min(self.ttls.get(name, self.ttl_seconds) for name in (agent.name, last_agent))
+        if ttl_seconds <= 0:
+            return
+        output = result.final_output
+        is_model = isinstance(output, BaseModel)
+        if is_model:
+            output = output.model_dump(mode="json")
+        try:
+            payload = json.dumps({"output": output, "is_model": is_model, "last_agent": last_agent})
+        except TypeError:
+            return
+        expires_at = time.time() + ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, payload)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO run_cache (key, payload, expires_at) VALUES (?, ?, ?)",
+                        (key, payload, expires_at),
+                    )
+
+    # --- Runner Replacement ---
+    async def run(self, agent: Agent, input: Any, **kwargs):
+        """
+        A drop-in replacement for `Runner.run(agent, input, **kwargs)`.
+        Runs that carry a session, context or conversation id depend on more
+        than the key captures, so they always go to the model.
+        """
+        if any(kwargs.get(name) is not None for name in ("session", "context", "previous_response_id", "conversation_id")):
+            self.stats["skipped"] += 1
+            return await Runner.run(agent, input, **kwargs)
+
+        cached = self.lookup(agent, input)
+        if cached is not None:
+            return cached
+        result = await Runner.run(agent, input, **kwargs)
+        self.store(agent, input, result)
+        return result
+
+    def summary(self) -> str:
+        """A one-line, human-readable report of cache effectiveness."""
+        return (
+            f"{self.stats['memory_hits']} memory hits, {self.stats['disk_hits']} disk hits, "
+            f"{self.stats['misses']} misses, {self.stats['skipped']} uncacheable"
+        )
+
+    def clear(self) -> None:
+        """Drops every cached entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM run_cache")
@@ -0,0 +1,143 @@
+# system/semantic_router.py
+"""
+A local, embedding-similarity router for triage decisions.
+
+Triage only picks a category, yet every call pays a full LLM round-trip. The
+`SemanticRouter` remembers queries that were already routed and answers new
+ones by cosine similarity against them, using a NumPy matrix of unit vectors.
+When the best match is not similar enough, or two labels are too close to
+call, it returns None and the caller falls back to the LLM, then teaches the
+router the LLM's answer with `add()`.
+
+By default queries are embedded locally with a hashing trick over words and
+character trigrams, which needs no model and takes microseconds. It measures
+word overlap, not meaning ("what is the time in Paris today" scores 0.85
+against a learned "what is the weather in Paris today"), so with it the
+router only answers near-repeats of learned queries (a 0.92 threshold).
+Pass a real embedding function (e.g. a sentence-transformer) to route
+paraphrases too; the looser 0.75 default then applies.
+"""
+import os
+import re
+import zlib
+from typing import Callable, List, Optional
+
+import numpy as np
+
+ROUTER_PATH = os.path.join(os.path.dirname(__file__), '..', '.cache', 'semantic_router.npz')
+
+# Default thresholds: lexical hashing only routes near-duplicates, real embeddings also route paraphrases.
+HASHING_THRESHOLD = 0.92
+EMBEDDING_THRESHOLD = 0.75
+
+
+class HashingEmbedder:
+    """Embeds text by hashing words and character trigrams into a fixed-size vector."""
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def __call__(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = re.findall(r"\w+", text.lower())
+        features = words + [
+            padded[i:i + 3] for word in words for padded in [f" {word} "] for i in range(len(padded) - 2)
+        ]
+        for feature in features:
+            # crc32 is stable across processes, unlike hash(), so saved indexes stay valid.
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class RouteDecision:
+    """The router's answer: the chosen label and how similar the closest example was."""
+    def __init__(self, label: str, score: float):
+        self.label = label
+        self.score = score
+
+    def __repr__(self) -> str:
+        return f"RouteDecision(label={self.label!r}, score={self.score:.3f})"
+
+
+class SemanticRouter:
+    """
+    Routes queries by cosine similarity to previously routed examples.
+
+    Args:
+        embed: Maps text to a vector. Defaults to `HashingEmbedder()`.
+        threshold: Minimum similarity to the closest example to answer at all.
+            Defaults to HASHING_THRESHOLD for the hashing embedder and
+            EMBEDDING_THRESHOLD for any other.
+        margin: Minimum gap between the best label and the runner-up label.
+    """
+    def __init__(
+        self,
+        embed: Optional[Callable[[str], np.ndarray]] = None,
+        threshold: Optional[float] = None,
+        margin: float = 0.1,
+    ):
+        self.embed = embed or HashingEmbedder()
+        if threshold is None:
+            threshold = HASHING_THRESHOLD if isinstance(self.embed, HashingEmbedder) else EMBEDDING_THRESHOLD
+        self.threshold = threshold
+        self.margin = margin
+        self.labels: List[str] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._label_ids = np.zeros(0, dtype=np.int32) # Parallel to `labels`, for vectorized masking
+        self._label_index: dict[str, int] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _unit(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embed(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def add(self, query: str, label: str) -> None:
+        """Remembers that `query` was routed to `label`."""
+        vector = self._unit(query)
+        if self._vectors is None:
+            self._vectors = np.zeros((16, vector.shape[0]), dtype=np.float32)
+        elif self._size == self._vectors.shape[0]:
+            # Grow by doubling so adding examples stays amortized O(1).
+            self._vectors = np.vstack([self._vectors, np.zeros_like(self._vectors)])
+        self._vectors[self._size] = vector
+        self.labels.append(label)
+        self._label_ids = np.append(self._label_ids, self._label_index.setdefault(label, len(self._label_index)))
+        self._size += 1
+
+    def route(self, query: str) -> Optional[RouteDecision]:
+        """Returns a confident routing decision, or None if the LLM should decide."""
+        if not self._size:
+            return None
+        scores = self._vectors[:self._size] @ self._unit(query)
+        best = int(np.argmax(scores))
+        best_label, best_score = self.labels[best], float(scores[best])
+        if best_score < self.threshold:
+            return None
+        other = scores[self._label_ids != self._label_ids[best]]
+        if other.size and best_score - float(other.max()) < self.margin:
+            return None # Too close to another label to be sure.
+        return RouteDecision(best_label, best_score)
+
+    def save(self, path: str = ROUTER_PATH) -> None:
+        """Saves the examples (vectors and labels) to a `.npz` file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        vectors = self._vectors[:self._size] if self._vectors is not None else np.zeros((0, 0), dtype=np.float32)
+        np.savez(path, vectors=vectors, labels=np.array(self.labels, dtype=str))
+
+    def load(self, path: str = ROUTER_PATH) -> "SemanticRouter":
+        """Loads examples saved by `save()`, if the file exists."""
+        if os.path.exists(path):
+            data = np.load(path)
+            self.labels = [str(label) for label in data["labels"]]
+            self._size = len(self.labels)
+            self._vectors = data["vectors"].astype(np.float32) if self._size else None
+            self._label_index = {}
+            self._label_ids = np.array(
+                [self._label_index.setdefault(label, len(self._label_index)) for label in self.labels], dtype=np.int32
+            )
+        return self
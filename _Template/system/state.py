@@ -0,0 +1,150 @@
+# system/state.py
+"""
+The state object passed between the nodes of a workflow graph.
+
+`WorkflowState` behaves like a dictionary with attribute access
+(`state["final_answer"]` and `state.final_answer` are the same value), but it
+is built for a graph that forks and checkpoints the state often:
+
+- The fields the engine itself uses (`initial_input`, `history`, `run_id`,
+  `metrics`, `abort_reason`, `next_node`, `final_answer`) live in
+  `__slots__`. Any other key a node sets goes into a small extra dict.
+- `fork()` makes a copy for a parallel branch without copying any values:
+  the fork shares the parent's values, and its extra dict is only copied the
+  first time the fork writes to it (copy-on-write).
+- `diff(other)` returns just the keys whose values differ from another
+  state (by identity, so it never compares large values element by element).
+
+Values are shared between a state and its forks, so replace a value instead
+of changing it in place when a branch should not affect the others (e.g.
+`state.notes = state.notes + [note]`, not `state.notes.append(note)`). The
+engine gives every branch its own `history` list.
+"""
+from typing import Any, Dict, Iterator, Mapping, MutableMapping, Tuple
+
+# Returned for a known field whose slot has not been assigned; such a field is not a key of the state.
+_UNSET = object()
+
+
+class WorkflowState(MutableMapping):
+    """
+    A dictionary-like object that holds the current state of the workflow.
+    It's passed between nodes, allowing agents to share information, and
+    allows attribute-style access (e.g., state.result).
+    """
+    FIELDS: Tuple[str, ...] = (
+        "initial_input", "history", "run_id", "metrics", "abort_reason", "next_node", "final_answer",
+    )
+    __slots__ = FIELDS + ("_extra", "_owns_extra")
+
+    def __init__(self, *args: Mapping[str, Any], **kwargs: Any):
+        object.__setattr__(self, "_extra", {})
+        object.__setattr__(self, "_owns_extra", True)
+        self.update(*args, **kwargs)
+
+    def _field(self, name: str) -> Any:
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            return _UNSET
+
+    # --- Mapping interface ---
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            value = self._field(key)
+            if value is _UNSET:
+                raise KeyError(key)
+            return value
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.FIELDS:
+            object.__setattr__(self, key, value)
+            return
+        if not self._owns_extra:
+            # First write since the fork: take a private copy of the shared dict.
+            object.__setattr__(self, "_extra", dict(self._extra))
+            object.__setattr__(self, "_owns_extra", True)
+        self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self.FIELDS:
+            if self._field(key) is _UNSET:
+                raise KeyError(key)
+            object.__delattr__(self, key)
+            return
+        if key not in self._extra:
+            raise KeyError(key)
+        if not self._owns_extra:
+            object.__setattr__(self, "_extra", dict(self._extra))
+            object.__setattr__(self, "_owns_extra", True)
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for field in self.FIELDS:
+            if self._field(field) is not _UNSET:
+                yield field
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(self._field(field) is not _UNSET for field in self.FIELDS) + len(self._extra)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self.FIELDS:
+            return self._field(key) is not _UNSET
+        return key in self._extra
+
+    # --- Attribute access ---
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names that are not methods or assigned slots: the extra keys.
+        if name in WorkflowState.__slots__:
+            raise AttributeError(name) # An unset field (or `_extra` before __init__ ran)
+        try:
+            return self._extra[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self[name] = value
+
+    def __delattr__(self, name: str) -> None:
+        try:
+            del self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    # --- Copies and diffs ---
+    def fork(self) -> "WorkflowState":
+        """
+        A copy for a parallel branch. Values are shared with this state, not
+        copied; writing a key in either state does not affect the other.
+        """
+        fork = WorkflowState.__new__(WorkflowState)
+        for field in self.FIELDS:
+            value = self._field(field)
+            if value is not _UNSET:
+                object.__setattr__(fork, field, value)
+        object.__setattr__(fork, "_extra", self._extra)
+        object.__setattr__(fork, "_owns_extra", False)
+        # This state must not write into the dict it now shares with the fork either.
+        object.__setattr__(self, "_owns_extra", False)
+        return fork
+
+    def diff(self, other: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        The keys of this state that `other` lacks or holds a different object
+        for, with this state's values. Values are compared by identity.
+        """
+        return {key: value for key, value in self.items() if key not in other or other[key] is not value}
+
+    def copy(self) -> "WorkflowState":
+        return self.fork()
+
+    def __repr__(self) -> str:
+        return f"WorkflowState({dict(self.items())!r})"
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __setstate__(self, data: Dict[str, Any]) -> None:
+        WorkflowState.__init__(self, data)
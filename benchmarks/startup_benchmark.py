@@ -0,0 +1,264 @@
+# benchmarks/startup_benchmark.py
+"""
+Cold-start profiling for every entry point in the repository.
+
+Each script that has an `if __name__ == "__main__":` block is started in a
+fresh interpreter with `-X importtime` and executed with a different
+`__name__`, so its imports and module-level setup (agents, tools, clients)
+run but its `main()` does not. For every entry point the harness records:
+
+- wall_seconds: the whole process, interpreter start-up included (median of runs)
+- module_seconds: executing the script itself, i.e. its imports and setup
+- peak_rss_mb: the process's peak resident memory
+- python_heap_peak_mb: the peak of Python allocations, from `tracemalloc`
+  (measured in a separate run, since tracing slows imports down)
+- top_imports: the slowest top-level imports, parsed from `-X importtime`
+
+Nothing talks to a model: the scripts' `main()` never runs, the API key is a
+placeholder and the OpenAI base URL points at a closed local port, so an
+accidental request fails immediately instead of going to the network.
+
+Usage:
+    python benchmarks/startup_benchmark.py                      # measure, write the report
+    python benchmarks/startup_benchmark.py --save-baseline      # also store it as the baseline
+    python benchmarks/startup_benchmark.py --check              # fail (exit 1) on regressions
+    python benchmarks/startup_benchmark.py --only Chapter-14
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+REPORT_PATH = os.path.join(os.path.dirname(__file__), 'startup_report.json')
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'startup_baseline.json')
+
+SKIP_DIRS = {"benchmarks", "__pycache__", ".git", ".cache", ".venv", "venv", "output"}
+
+# Runs inside the child interpreter. It executes the entry point without
+# triggering its `__main__` block and prints the measurements as JSON.
+CHILD_SCRIPT = r"""
+import json, os, runpy, sys, time
+path, trace_memory = sys.argv[1], sys.argv[2] == "1"
+sys.path.insert(0, os.path.dirname(path))
+if trace_memory:
+    import tracemalloc
+    tracemalloc.start()
+started = time.perf_counter()
+error = None
+try:
+    runpy.run_path(path, run_name="__startup_benchmark__")
+except BaseException as e:
+    error = f"{type(e).__name__}: {e}"
+result = {"module_seconds": time.perf_counter() - started, "error": error}
+if trace_memory:
+    result["python_heap_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    result["peak_rss_bytes"] = rss if sys.platform == "darwin" else rss * 1024
+except ImportError:
+    pass
+sys.stdout.flush()
+print("\n@@STARTUP@@" + json.dumps(result))
+"""
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def discover_entry_points(root: str = REPO_ROOT) -> List[str]:
+    """Finds every script (relative to `root`) with an `if __name__ == "__main__":` block."""
+    entry_points = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if d not in SKIP_DIRS and not d.startswith('.'))
+        for name in sorted(files):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                if re.search(r"^if __name__ == ['\"]__main__['\"]:", f.read(), re.MULTILINE):
+                    entry_points.append(os.path.relpath(path, root))
+    return entry_points
+
+
+def parse_importtime(stderr: str, top: int = 5) -> List[Dict[str, Any]]:
+    """Returns the `top` slowest top-level imports from `-X importtime` output."""
+    imports = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Top-level imports have a single space of indentation before the name.
+        if match and len(match.group(3)) <= 1:
+            imports.append({"module": match.group(4), "cumulative_ms": round(int(match.group(2)) / 1000, 1)})
+    imports.sort(key=lambda item: item["cumulative_ms"], reverse=True)
+    return imports[:top]
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-startup-benchmark")
+    env["OPENAI_BASE_URL"] = "http://127.0.0.1:9/v1" # Nothing listens here: requests fail fast.
+    env["OPENAI_AGENTS_DISABLE_TRACING"] = "1"
+    env["PYTHONIOENCODING"] = "utf-8"
+    return env
+
+
+def _run_child(path: str, trace_memory: bool, timeout: float) -> Dict[str, Any]:
+    command = [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT, path, "1" if trace_memory else "0"]
+    started = time.perf_counter()
+    try:
+        process = subprocess.run(
+            command, cwd=os.path.dirname(path), env=_child_env(), capture_output=True,
+            text=True, timeout=timeout, stdin=subprocess.DEVNULL,
+        )
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout}s"}
+    wall = time.perf_counter() - started
+    marker = process.stdout.rfind("@@STARTUP@@")
+    if marker < 0:
+        tail = process.stderr.strip().splitlines()[-1:] or ["no output"]
+        return {"error": f"child exited with {process.returncode}: {tail[0]}"}
+    result = json.loads(process.stdout[marker + len("@@STARTUP@@"):])
+    result["wall_seconds"] = wall
+    result["stderr"] = process.stderr
+    return result
+
+
+def measure_entry_point(relpath: str, repeat: int = 3, timeout: float = 60.0) -> Dict[str, Any]:
+    """Measures one entry point: `repeat` timed runs plus one `tracemalloc` run."""
+    path = os.path.join(REPO_ROOT, relpath)
+    runs = [_run_child(path, trace_memory=False, timeout=timeout) for _ in range(max(1, repeat))]
+    failed = next((run for run in runs if run.get("error")), None)
+    if failed:
+        return {"status": "error", "error": failed["error"]}
+
+    fastest = min(runs, key=lambda run: run["wall_seconds"])
+    memory = _run_child(path, trace_memory=True, timeout=timeout)
+    return {
+        "status": "ok",
+        "wall_seconds": round(statistics.median(run["wall_seconds"] for run in runs), 4),
+        "module_seconds": round(statistics.median(run["module_seconds"] for run in runs), 4),
+        "peak_rss_mb": round(max(run.get("peak_rss_bytes", 0) for run in runs) / 2**20, 1),
+        "python_heap_peak_mb": round(memory.get("python_heap_peak_bytes", 0) / 2**20, 1),
+        "top_imports": parse_importtime(fastest["stderr"]),
+    }
+
+
+def find_regressions(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_tolerance: float = 0.25,
+    min_time_delta: float = 0.05,
+    memory_tolerance: float = 0.20,
+) -> List[str]:
+    """
+    Compares a report with a baseline. Time must grow by more than both the
+    relative tolerance and `min_time_delta` seconds to count, so noise on
+    very fast scripts is not reported. Entry points that worked in the
+    baseline and now fail are regressions too.
+    """
+    regressions = []
+    for relpath, old in baseline.get("entry_points", {}).items():
+        new = report["entry_points"].get(relpath)
+        if new is None or old.get("status") != "ok":
+            continue
+        if new["status"] != "ok":
+            regressions.append(f"{relpath}: now fails to start ({new['error']})")
+            continue
+        delta = new["wall_seconds"] - old["wall_seconds"]
+        if delta > min_time_delta and new["wall_seconds"] > old["wall_seconds"] * (1 + time_tolerance):
+            regressions.append(f"{relpath}: start-up {old['wall_seconds']:.3f}s -> {new['wall_seconds']:.3f}s")
+        if old["peak_rss_mb"] and new["peak_rss_mb"] > old["peak_rss_mb"] * (1 + memory_tolerance):
+            regressions.append(f"{relpath}: peak RSS {old['peak_rss_mb']}MB -> {new['peak_rss_mb']}MB")
+    return regressions
+
+
+def run_benchmark(only: Optional[List[str]] = None, repeat: int = 3, timeout: float = 60.0, console: Optional[Console] = None) -> Dict[str, Any]:
+    """Measures every (selected) entry point and returns the report."""
+    console = console or Console()
+    entry_points = [
+        relpath for relpath in discover_entry_points()
+        if not only or any(relpath.startswith(prefix) for prefix in only)
+    ]
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "repeat": repeat,
+        "entry_points": {},
+    }
+    for relpath in entry_points:
+        with console.status(f"Measuring {relpath}..."):
+            report["entry_points"][relpath] = measure_entry_point(relpath, repeat, timeout)
+    return report
+
+
+def print_report(report: Dict[str, Any], console: Console) -> None:
+    table = Table(title="Entry point start-up")
+    for column in ("Entry point", "Wall (s)", "Module (s)", "Peak RSS (MB)", "Py heap (MB)", "Slowest import"):
+        table.add_column(column)
+    for relpath, entry in report["entry_points"].items():
+        if entry["status"] != "ok":
+            table.add_row(relpath, "[red]error[/red]", "", "", "", entry["error"][:60])
+            continue
+        slowest = entry["top_imports"][0] if entry["top_imports"] else None
+        table.add_row(
+            relpath, f"{entry['wall_seconds']:.3f}", f"{entry['module_seconds']:.3f}",
+            f"{entry['peak_rss_mb']}", f"{entry['python_heap_peak_mb']}",
+            f"{slowest['module']} ({slowest['cumulative_ms']}ms)" if slowest else "",
+        )
+    console.print(table)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start time and memory of every entry point.")
+    parser.add_argument("--only", nargs="*", help="Only entry points whose path starts with one of these prefixes.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per entry point (the median is reported).")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds before a start-up is abandoned.")
+    parser.add_argument("--report", default=REPORT_PATH, help="Where to write the JSON report.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if anything regressed.")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="Allowed relative slow-down.")
+    parser.add_argument("--memory-tolerance", type=float, default=0.20, help="Allowed relative RSS growth.")
+    args = parser.parse_args()
+
+    console = Console()
+    report = run_benchmark(args.only, args.repeat, args.timeout, console)
+    print_report(report, console)
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    console.print(f"[grey50]Report written to {args.report}[/grey50]")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        console.print(f"[grey50]Baseline saved to {args.baseline}[/grey50]")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            console.print(f"[bold red]No baseline at {args.baseline}; run with --save-baseline first.[/bold red]")
+            return 1
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.time_tolerance, memory_tolerance=args.memory_tolerance)
+        if regressions:
+            console.print("[bold red]Start-up regressions:[/bold red]")
+            for regression in regressions:
+                console.print(f"  - {regression}")
+            return 1
+        console.print("[bold green]No start-up regressions.[/bold green]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())